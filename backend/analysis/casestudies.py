@@ -1,50 +1,63 @@
 """
 Analyzes individual case study projects using screenshot + scraping + Gemini
+Projects are processed concurrently; each I/O stage (plain HTTP scraping,
+browser pages, Gemini calls) has its own process-wide concurrency limit.
+Pages the portfolio scraper already discovered can be captured
+speculatively (ProjectPrefetcher) while the portfolio prompt is running.
+
+SCORING_MODE picks how pages are sent to Gemini:
+  "single": one call per project with the full rubric (default)
+  "cached": one call per project, rubric registered once as a cached prefix
+  "batch":  several small projects per call, answers split per project
 """
 import os
 import json
+import threading
 from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
-from analysis.screenshot import capture_screenshot
+from analysis.screenshot import capture_screenshot, capture_page
 from scrapers.scraper import scrape_project_page
-from utils.gemini_api import analyze_content
-from urllib.parse import urlparse
+from scrapers import designfolio
+from utils.gemini_api import analyze_content_streaming
+from utils import report_store, events, scrape_cache, compaction, schemas
+from utils.gemini_client import estimate_tokens
 
+# "combined": one browser visit yields both DOM data and screenshot
+# "separate": plain HTTP scrape + separate screenshot visit
+CAPTURE_MODE = os.environ.get("CAPTURE_MODE", "combined")
 
-def create_project_slug(url):
-    """Create a safe filename from URL."""
-    parsed = urlparse(url)
-    slug = parsed.netloc.replace(".", "_") + parsed.path.replace("/", "_")
-    return slug[:150]
+# ---------------------------------------
+# CONCURRENCY LIMITS
+# ---------------------------------------
+PROJECT_CONCURRENCY = int(os.environ.get("PROJECT_CONCURRENCY", 4))
+HTTP_SCRAPE_CONCURRENCY = int(os.environ.get("HTTP_SCRAPE_CONCURRENCY", 8))
+BROWSER_PAGE_CONCURRENCY = int(os.environ.get("BROWSER_PAGE_CONCURRENCY", 2))
 
+_http_slots = threading.BoundedSemaphore(HTTP_SCRAPE_CONCURRENCY)
+_browser_slots = threading.BoundedSemaphore(BROWSER_PAGE_CONCURRENCY)
 
-def analyze_projects(project_links, parent_url):
-    """
-    Analyzes each project page using:
-      - HTML scraping
-      - Screenshot capture
-      - Gemini case-study scoring prompt
-    """
-    count = 0
+# Speculative capture of scraper-discovered project pages
+PREFETCH_PROJECTS = os.environ.get("PREFETCH_PROJECTS", "1") != "0"
+PREFETCH_LIMIT = int(os.environ.get("PREFETCH_LIMIT", 12))  # pages per job
 
-    for idx, link in enumerate(project_links, 1):
-        print(f"\n  [{idx}/{len(project_links)}] Analyzing project: {link}")
+# Gemini scoring: "single" | "cached" | "batch"
+SCORING_MODE = os.environ.get("SCORING_MODE", "single")
+SCORING_BATCH_SIZE = int(os.environ.get("SCORING_BATCH_SIZE", 3))              # projects per call
+SCORING_BATCH_MAX_TOKENS = int(os.environ.get("SCORING_BATCH_MAX_TOKENS", 1000))  # per project
 
-        try:
-            # --------------------------------------
-            # SCRAPE PROJECT PAGE
-            # --------------------------------------
-            scraped_data = scrape_project_page(link)
-
-            # --------------------------------------
-            # TAKE SCREENSHOT
-            # --------------------------------------
-            screenshot_path = capture_screenshot(link)
-
-            # --------------------------------------
-            # GEMINI CASE-STUDY PROMPT
-            # --------------------------------------
-            prompt = f"""
+_scoring_counters = Counter()
+_scoring_lock = threading.Lock()
+
+
+def screenshot_dir_for(job_id):
+    return os.path.join(report_store.SCREENSHOT_ROOT, job_id)
+
+
+# Static part of the case-study prompt; page data is appended after it so
+# the rubric can be sent once as a cached prefix (SCORING_MODE=cached)
+CASE_STUDY_RUBRIC = """
 You are an expert UX case study reviewer with deep knowledge of design thinking, user research, and best practices in product design.
 
 Analyze the provided case study page according to this comprehensive scoring model:
@@ -59,241 +72,222 @@ Analyze the provided case study page according to this comprehensive scoring mod
 6. Storytelling (10 points)
 7. Bonus Points (5 points)
 
----------------------------
-CASE STUDY PAGE DATA
----------------------------
-
-Title: {scraped_data.get('title', 'N/A')}
-URL: {scraped_data.get('url', link)}
-Description: {scraped_data.get('meta_description', 'N/A')}
-Content Length: {scraped_data.get('full_text_length', 0)} characters
-Total Images: {scraped_data.get('total_images', 0)}
-Headings Count: {len(scraped_data.get('headings', []))}
-
-TEXT CONTENT (first 5000 chars):
-{scraped_data.get('text_content', '')[:5000]}
-
-HEADINGS:
-{json.dumps(scraped_data.get('headings', [])[:15], indent=2)}
-
-A screenshot of the case study page is also provided for visual assessment.
-
 ---------------------------
 RESPONSE FORMAT (STRICT)
 ---------------------------
 Return ONLY **valid JSON** (no markdown, no commentary).
 Use EXACTLY this structure:
 
-{{
+{
   "overall_score": <number 0-100>,
 
   "phase_scores": [
-    {{
+    {
       "phase": "Research & Insights",
       "score": <number>,
       "max_score": 15,
       "reasoning": "<detailed explanation>",
       "subsections": [
-        {{
+        {
           "name": "Secondary research",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Primary research",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Quality & depth of insights",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }}
+        }
       ]
-    }},
+    },
 
-    {{
+    {
       "phase": "Context, Domain & Problem Definition",
       "score": <number>,
       "max_score": 15,
       "reasoning": "<detailed explanation>",
       "subsections": [
-        {{
+        {
           "name": "Problem statement clarity",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Business context & target audience",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Success metrics defined",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }}
+        }
       ]
-    }},
+    },
 
-    {{
+    {
       "phase": "Ideation & Design Process",
       "score": <number>,
       "max_score": 20,
       "reasoning": "<detailed explanation>",
       "subsections": [
-        {{
+        {
           "name": "Brainstorming & ideation",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Design iterations",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Wireframes/sketches/prototypes",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Design decision rationale",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }}
+        }
       ]
-    }},
+    },
 
-    {{
+    {
       "phase": "Visual Design & UX/UI Quality",
       "score": <number>,
       "max_score": 20,
       "reasoning": "<detailed explanation>",
       "subsections": [
-        {{
+        {
           "name": "Visual hierarchy & aesthetics",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Layout, grids & design system",
           "score": <number>,
           "max_score": 6,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Accessibility",
           "score": <number>,
           "max_score": 3,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "UX copywriting",
           "score": <number>,
           "max_score": 3,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Microinteractions & feedback",
           "score": <number>,
           "max_score": 3,
           "reasoning": "<explanation>"
-        }}
+        }
       ]
-    }},
+    },
 
-    {{
+    {
       "phase": "Validation & Iteration",
       "score": <number>,
       "max_score": 15,
       "reasoning": "<detailed explanation>",
       "subsections": [
-        {{
+        {
           "name": "Usability testing",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Feedback incorporation",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Metrics & results",
           "score": <number>,
           "max_score": 5,
           "reasoning": "<explanation>"
-        }}
+        }
       ]
-    }},
+    },
 
-    {{
+    {
       "phase": "Storytelling & UX Copywriting",
       "score": <number>,
       "max_score": 10,
       "reasoning": "<detailed explanation>",
       "subsections": [
-        {{
+        {
           "name": "Narrative flow",
           "score": <number>,
           "max_score": 3,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Presentation & visuals",
           "score": <number>,
           "max_score": 3,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Writing quality",
           "score": <number>,
           "max_score": 4,
           "reasoning": "<explanation>"
-        }}
+        }
       ]
-    }},
+    },
 
-    {{
+    {
       "phase": "Bonus Points",
       "score": <number>,
       "max_score": 5,
       "reasoning": "<explanation>",
       "subsections": [
-        {{
+        {
           "name": "Gamification",
           "score": <number>,
           "max_score": 2,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Innovation",
           "score": <number>,
           "max_score": 2,
           "reasoning": "<explanation>"
-        }},
-        {{
+        },
+        {
           "name": "Systems thinking",
           "score": <number>,
           "max_score": 1,
           "reasoning": "<explanation>"
-        }}
+        }
       ]
-    }}
+    }
   ],
 
   "summary": "<2-3 paragraph summary>",
@@ -301,52 +295,472 @@ Use EXACTLY this structure:
   "ux_keywords": ["<keyword1>", "<keyword2>", "..."],
 
   "improvements": [
-    {{
+    {
       "phase": "<phase>",
       "issue": "<issue>",
       "recommendation": "<action>"
-    }}
+    }
   ],
 
   "verdict": "<one-line final verdict>"
-}}
+}
 """
 
-            # --------------------------------------
-            # RUN GEMINI MODEL
-            # --------------------------------------
-            try:
-                analysis = analyze_content(prompt, {
-                    "scraped_data": scraped_data,
-                    "screenshot": screenshot_path
-                })
-            except Exception as e:
-                print(f"    ❌ Gemini failed: {e}")
-                continue
+BATCH_INSTRUCTIONS = """
+---------------------------
+MULTIPLE CASE STUDIES
+---------------------------
+
+The {count} pages below are separate case studies. Score each one on its own
+with the scoring model above; do not compare them with each other.
+
+Return ONLY valid JSON of the form {{"projects": [...]}} with one element per
+project, in order. Each element is the object described under RESPONSE FORMAT
+plus "project": <project number> and "url": "<project url>".
+"""
+
+
+def case_study_page_block(scraped_data, link, heading="CASE STUDY PAGE DATA"):
+    """Data section of the case-study prompt for one scraped project page."""
+    return f"""
+---------------------------
+{heading}
+---------------------------
+
+Title: {scraped_data.get('title', 'N/A')}
+URL: {scraped_data.get('url', link)}
+Description: {scraped_data.get('meta_description', 'N/A')}
+Content Length: {scraped_data.get('full_text_length', 0)} characters
+Total Images: {scraped_data.get('total_images', 0)}
+Headings Count: {len(scraped_data.get('headings', []))}
+
+TEXT CONTENT (repeats and boilerplate removed; "…" marks omitted passages):
+{scraped_data.get('text_content', '')}
+
+HEADINGS:
+{json.dumps(scraped_data.get('headings', [])[:15], ensure_ascii=False)}
+
+A screenshot of the case study page is also provided for visual assessment.
+"""
+
+
+def build_case_study_prompt(scraped_data, link):
+    """Case-study scoring prompt for one scraped project page."""
+    return CASE_STUDY_RUBRIC + case_study_page_block(scraped_data, link)
+
+
+def build_batch_prompt(pages):
+    """One scoring prompt for several (scraped_data, link) pages."""
+    blocks = "".join(
+        case_study_page_block(scraped_data, link, f"PROJECT {number}: {link}")
+        for number, (scraped_data, link) in enumerate(pages, 1)
+    )
+    return CASE_STUDY_RUBRIC + BATCH_INSTRUCTIONS.format(count=len(pages)) + blocks
+
+
+def capture_project(link, screenshot_dir):
+    """
+    Scrape + screenshot one project page according to CAPTURE_MODE.
+
+    Returns:
+        (dict, dict | None): scraped data and screenshot variants
+    """
+    if designfolio.is_project_url(link):
+        # --------------------------------------
+        # DESIGNFOLIO: STRUCTURED DATA WITHOUT RENDERING
+        # --------------------------------------
+        with _http_slots:
+            scraped_data = designfolio.fetch_project(link)
+        if scraped_data is not None:
+            with _browser_slots:
+                screenshots = capture_screenshot(link, output_dir=screenshot_dir)
+            return scraped_data, screenshots
+
+    if CAPTURE_MODE == "combined":
+        # --------------------------------------
+        # SINGLE BROWSER VISIT (DOM DATA + SCREENSHOT)
+        # --------------------------------------
+        with _browser_slots:
+            scraped_data, screenshots = capture_page(link, output_dir=screenshot_dir)
+        if scraped_data is not None:
+            return scraped_data, screenshots
+
+        print(f"    ⚠️  Combined capture failed, falling back to HTTP scrape: {link}")
+        with _http_slots:
+            return scrape_project_page(link), None
+
+    # --------------------------------------
+    # SCRAPE PROJECT PAGE
+    # --------------------------------------
+    with _http_slots:
+        scraped_data = scrape_project_page(link)
+
+    # --------------------------------------
+    # TAKE SCREENSHOT
+    # --------------------------------------
+    with _browser_slots:
+        screenshots = capture_screenshot(link, output_dir=screenshot_dir)
+
+    return scraped_data, screenshots
+
+
+class ProjectPrefetcher:
+    """
+    Captures (scrape + screenshot) scraper-discovered project pages in the
+    background while the portfolio prompt runs. analyze_projects() claims
+    the captures for links it keeps; the rest are cancelled.
+    """
+
+    def __init__(self, links, job_id):
+        links = list(dict.fromkeys(links))[:PREFETCH_LIMIT]
+        screenshot_dir = screenshot_dir_for(job_id)
+
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, min(PROJECT_CONCURRENCY, len(links))),
+            thread_name_prefix="prefetch",
+        )
+        self._futures = {
+            scrape_cache.normalize_url(link):
+                self._pool.submit(capture_project, link, screenshot_dir)
+            for link in links
+        }
+        self._lock = threading.Lock()
+
+        if links:
+            print(f"🚀 Prefetching {len(links)} scraper-discovered project pages")
+            events.stage(job_id, "projects_prefetching",
+                         f"Capturing {len(links)} project pages in the background",
+                         total=len(links))
+
+    def claim(self, link):
+        """Future for link's (scraped_data, screenshots), or None if not prefetched."""
+        with self._lock:
+            return self._futures.pop(scrape_cache.normalize_url(link), None)
+
+    def close(self):
+        """
+        Cancel captures nobody claimed (pages already loading finish on their
+        own). Claimed captures still waiting for a worker keep their place.
+        """
+        with self._lock:
+            unclaimed, self._futures = self._futures, {}
+        cancelled = sum(future.cancel() for future in unclaimed.values())
+        self._pool.shutdown(wait=False)
+        return len(unclaimed), cancelled
+
+
+def _count(event, n=1):
+    with _scoring_lock:
+        _scoring_counters[event] += n
+
+
+def prepare_project(link, idx, total, screenshot_dir, captured=None):
+    """
+    Capture one project page (reusing a prefetched capture when given)
+    and compact its data for the prompt.
+
+    Returns:
+        (dict, dict | None, dict): scraped data, screenshot variants, prompt data
+    """
+    print(f"\n  [{idx}/{total}] Analyzing project: {link}")
+
+    scraped_data = screenshots = None
+    if captured is not None:
+        try:
+            scraped_data, screenshots = captured.result()
+            print(f"    ⚡ Using prefetched capture: {link}")
+        except Exception as e:
+            print(f"    ⚠️  Prefetched capture failed ({e}), capturing again")
+
+    if scraped_data is None:
+        scraped_data, screenshots = capture_project(link, screenshot_dir)
+
+    # Prompt gets de-duplicated, budgeted text; the report keeps the full scrape
+    return scraped_data, screenshots, compaction.compact_case_study(scraped_data)
+
 
-            # --------------------------------------
-            # SAVE REPORT
-            # --------------------------------------
-            slug = create_project_slug(link)
-            report_path = f"backend/reports/{slug}.json"
+def build_report(link, parent_url, scraped_data, screenshots, analysis):
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "url": link,
+        "parent_portfolio": parent_url,
+        "screenshot": screenshots["master"] if screenshots else None,
+        "screenshot_variants": screenshots,
+        "scraped_data": scraped_data,
+        "analysis": analysis  # <-- NEW DIRECT STRUCTURE
+    }
 
-            report = {
-                "generated_at": datetime.now().isoformat(),
-                "url": link,
-                "parent_portfolio": parent_url,
-                "screenshot": screenshot_path,
-                "scraped_data": scraped_data,
-                "analysis": analysis  # <-- NEW DIRECT STRUCTURE
-            }
 
-            with open(report_path, "w", encoding="utf-8") as f:
-                json.dump(report, f, indent=2, ensure_ascii=False)
+def score_project(link, prompt_data, screenshot_path, on_phase=None):
+    """
+    Score one page with its own Gemini call, streaming phase scores to
+    on_phase(phase, phases_done). With SCORING_MODE "cached" the rubric
+    goes out as a cached prefix instead of inline.
+    """
+    prefix = None
+    prompt = build_case_study_prompt(prompt_data, link)
+    if SCORING_MODE == "cached":
+        prefix, prompt = CASE_STUDY_RUBRIC, case_study_page_block(prompt_data, link)
+
+    # Concurrency and rate limits are applied by utils.gemini_client
+    analysis = analyze_content_streaming(
+        prompt,
+        {"scraped_data": prompt_data, "screenshot": screenshot_path},
+        "phase_scores",
+        on_phase or (lambda phase, count: None),
+        prefix=prefix,
+        tag=f"case_study:{SCORING_MODE}",
+        schema=schemas.CASE_STUDY_SCHEMA,
+    )
+    _count(f"{SCORING_MODE}_projects")
+    return analysis
+
+
+def score_batch(batch, on_scored):
+    """
+    Score several small projects with one Gemini call.
+
+    Args:
+        batch (list): (idx, link, prompt_data) per project
+        on_scored (callable): on_scored(idx, analysis), called as soon as a
+            project's answer has streamed in
+
+    Returns:
+        list: the batch entries that got no usable answer
+    """
+    numbered = dict(enumerate(batch, 1))
+    delivered = set()
+    delivered_lock = threading.Lock()
+
+    def deliver(element, count=None):
+        try:
+            number = int(element.get("project"))
+        except (AttributeError, TypeError, ValueError):
+            return
+        if number not in numbered:
+            return
+        analysis = schemas.coerce(
+            {k: v for k, v in element.items() if k not in ("project", "url")},
+            schemas.CASE_STUDY_SCHEMA,
+        )
+        # Incomplete answers are re-scored on their own (with field re-asks)
+        if schemas.validate(analysis, schemas.CASE_STUDY_SCHEMA):
+            return
+        with delivered_lock:
+            if number in delivered:
+                return
+            delivered.add(number)
+        on_scored(numbered[number][0], analysis)
+
+    print(f"    📦 Scoring {len(batch)} projects in one request")
+    prompt = build_batch_prompt([(prompt_data, link) for _, link, prompt_data in batch])
+    try:
+        result = analyze_content_streaming(
+            prompt,
+            {"projects": [prompt_data for _, _, prompt_data in batch]},
+            "projects",
+            deliver,
+            tag="case_study:batch",
+            schema=schemas.CASE_STUDY_BATCH_SCHEMA,
+            reask=False,
+        )
+        # Elements the stream did not deliver (e.g. after a non-streaming retry)
+        for element in (result.get("projects") or []) if isinstance(result, dict) else []:
+            deliver(element)
+    except Exception as e:
+        print(f"    ❌ Batch scoring failed: {e}")
+
+    _count("batch_requests")
+    _count("batch_projects", len(delivered))
+    leftovers = [entry for number, entry in numbered.items() if number not in delivered]
+    if leftovers:
+        _count("batch_fallbacks", len(leftovers))
+        print(f"    ⚠️  {len(leftovers)} project(s) missing from batch answer, scoring separately")
+    return leftovers
+
+
+def plan_batches(prepared):
+    """
+    Split (idx, link, prompt_data) entries into batches of small pages and
+    pages scored on their own, keeping portfolio order within batches.
+    """
+    small, single = [], []
+    for entry in prepared:
+        _, link, prompt_data = entry
+        size = estimate_tokens(case_study_page_block(prompt_data, link))
+        (small if size <= SCORING_BATCH_MAX_TOKENS else single).append(entry)
+
+    batches = [small[i:i + SCORING_BATCH_SIZE] for i in range(0, len(small), SCORING_BATCH_SIZE)]
+    # A batch of one gains nothing over a normal call
+    if batches and len(batches[-1]) == 1:
+        single.extend(batches.pop())
+    return batches, single
+
+
+def analyze_project(link, idx, total, parent_url, screenshot_dir, captured=None,
+                    on_phase=None):
+    """
+    Scrape, screenshot and score one project page.
 
-            print(f"    ✅ Saved project report: {report_path}")
-            count += 1
+    Args:
+        captured (Future): Prefetched (scraped_data, screenshots), if any
+        on_phase (callable): on_phase(title, phase, phases_done) for each
+            phase score as it streams in
 
+    Returns:
+        dict: the case-study report, or None if Gemini failed
+    """
+    scraped_data, screenshots, prompt_data = prepare_project(
+        link, idx, total, screenshot_dir, captured
+    )
+    screenshot_path = screenshots["master"] if screenshots else None
+
+    # --------------------------------------
+    # RUN GEMINI MODEL
+    # --------------------------------------
+    def phase_scored(phase, count):
+        if on_phase is not None:
+            on_phase(scraped_data.get("title", ""), phase, count)
+
+    try:
+        analysis = score_project(link, prompt_data, screenshot_path, phase_scored)
+    except Exception as e:
+        print(f"    ❌ Gemini failed: {e}")
+        return None
+
+    return build_report(link, parent_url, scraped_data, screenshots, analysis)
+
+
+def analyze_projects(project_links, parent_url, job_id, prefetcher=None):
+    """
+    Analyzes each project page using:
+      - HTML scraping
+      - Screenshot capture
+      - Gemini case-study scoring prompt
+
+    Up to PROJECT_CONCURRENCY projects run at once (1 = sequential).
+    A failing project never affects the others, and reports keep their
+    portfolio order (position) however they finish.
+
+    With a prefetcher, pages it already captured are reused, pages it
+    lacks are captured as usual and its unused captures are cancelled.
+
+    With SCORING_MODE "batch" all pages are captured first, then small
+    ones are scored SCORING_BATCH_SIZE at a time (see score_batch).
+
+    Reports (and screenshots) are stored under the job's namespace.
+    """
+    total = len(project_links)
+    screenshot_dir = screenshot_dir_for(job_id)
+
+    captures = {}
+    if prefetcher is not None:
+        captures = {link: prefetcher.claim(link) for link in project_links}
+        unused, cancelled = prefetcher.close()
+        reused = sum(future is not None for future in captures.values())
+        print(f"🔀 Reconciled prefetch: {reused} reused, {total - reused} new, "
+              f"{unused} not needed ({cancelled} cancelled before starting)")
+    progress = {"done": 0}
+    progress_lock = threading.Lock()
+
+    def finish(idx, link, report):
+        if report is None:
+            events.stage(job_id, "project_failed", f"Project {idx}/{total} failed", url=link)
+            return False
+
+        # --------------------------------------
+        # SAVE REPORT
+        # --------------------------------------
+        report_store.save_report(
+            job_id, parent_url, report_store.CASE_STUDY, report,
+            url=link, position=idx
+        )
+        print(f"    ✅ Saved project report: {link}")
+
+        with progress_lock:
+            progress["done"] += 1
+            done = progress["done"]
+        events.report(job_id, report, idx, f"Project {done}/{total} scored",
+                      done=done, total=total)
+        return True
+
+    def run(idx, link):
+        try:
+            report = analyze_project(
+                link, idx, total, parent_url, screenshot_dir,
+                captured=captures.get(link),
+                on_phase=lambda title, phase, count: events.partial(
+                    job_id, idx, link, title, phase, count
+                ),
+            )
         except Exception as e:
             print(f"    ❌ Error analyzing {link}: {e}")
-            continue
+            report = None
+        return finish(idx, link, report)
+
+    workers = max(1, min(PROJECT_CONCURRENCY, total))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="case-study") as pool:
+        if SCORING_MODE != "batch":
+            return sum(pool.map(run, range(1, total + 1), project_links))
+
+        # --------------------------------------
+        # BATCH MODE: CAPTURE ALL, THEN SCORE SMALL PAGES TOGETHER
+        # --------------------------------------
+        captured = {}
+
+        def prepare(idx, link):
+            try:
+                captured[idx] = prepare_project(
+                    link, idx, total, screenshot_dir, captures.get(link)
+                )
+                return True
+            except Exception as e:
+                print(f"    ❌ Error capturing {link}: {e}")
+                return finish(idx, link, None)
+
+        list(pool.map(prepare, range(1, total + 1), project_links))
+        links = dict(enumerate(project_links, 1))
+        batches, single = plan_batches(
+            [(idx, links[idx], captured[idx][2]) for idx in sorted(captured)]
+        )
+
+        def scored(idx, analysis):
+            scraped_data, screenshots, _ = captured[idx]
+            finish(idx, links[idx], build_report(
+                links[idx], parent_url, scraped_data, screenshots, analysis
+            ))
+
+        leftovers = pool.map(lambda batch: score_batch(batch, scored), batches)
+        single.extend(entry for batch_leftovers in leftovers for entry in batch_leftovers)
+
+        def run_single(entry):
+            idx, link, prompt_data = entry
+            scraped_data, screenshots, _ = captured[idx]
+            try:
+                analysis = score_project(
+                    link, prompt_data, screenshots["master"] if screenshots else None,
+                    lambda phase, count: events.partial(
+                        job_id, idx, link, scraped_data.get("title", ""), phase, count
+                    ),
+                )
+            except Exception as e:
+                print(f"    ❌ Gemini failed: {e}")
+                return finish(idx, link, None)
+            return finish(idx, link, build_report(
+                link, parent_url, scraped_data, screenshots, analysis
+            ))
+
+        list(pool.map(run_single, sorted(single)))
+
+    return progress["done"]
+
 
-    return count
+def scoring_stats():
+    """Projects scored per SCORING_MODE plus batch hit/fallback counts."""
+    with _scoring_lock:
+        counters = dict(_scoring_counters)
+    return {
+        "mode": SCORING_MODE,
+        "batch_size": SCORING_BATCH_SIZE,
+        "counters": counters,
+    }
@@ -1,108 +1,403 @@
+import io
 import os
 import time
 from datetime import datetime
-from playwright.sync_api import sync_playwright
 
-def wait_for_full_load(page, timeout=15000):
-    """Wait until the page has no active network connections for 500ms."""
-    page.wait_for_load_state("domcontentloaded")
+from PIL import Image
 
-    start_time = time.time()
-    last_activity = time.time()
+from scrapers.scraper import extract_from_page
+from utils import browser_pool, scrape_cache
+from utils.scrolling import scroll_page
 
-    while True:
-        activity = page.evaluate("() => window.performance.getEntriesByType('resource').length")
-        
-        # If no new network activity for 500ms → assume stable
-        if activity == 0:
-            if time.time() - last_activity >= 0.5:
-                break
-        else:
-            last_activity = time.time()
+# Encoded screenshot variants
+SCREENSHOT_FORMAT = os.environ.get("SCREENSHOT_FORMAT", "webp").lower()  # webp | jpeg
+SCREENSHOT_QUALITY = int(os.environ.get("SCREENSHOT_QUALITY", 75))
+SCREENSHOT_MASTER_WIDTH = int(os.environ.get("SCREENSHOT_MASTER_WIDTH", 1440))
+SCREENSHOT_PREVIEW_WIDTH = int(os.environ.get("SCREENSHOT_PREVIEW_WIDTH", 960))
+SCREENSHOT_THUMB_WIDTH = int(os.environ.get("SCREENSHOT_THUMB_WIDTH", 360))
+WEBP_MAX_DIMENSION = 16383
 
-        if time.time() - start_time > timeout / 1000:
-            print("⏳ Timed out waiting for resource stability.")
-            break
+# Full-page captures of long case studies exceed Pillow's decompression-bomb
+# guard; these are our own images, so lift it.
+Image.MAX_IMAGE_PIXELS = None
 
-        time.sleep(0.1)
+# Capture strategy: "auto" (segmented for long pages), "full" or "segmented"
+CAPTURE_STRATEGY = os.environ.get("CAPTURE_STRATEGY", "auto")
+# Pages are cut off below this height (CSS px)
+SCREENSHOT_MAX_HEIGHT = int(os.environ.get("SCREENSHOT_MAX_HEIGHT", 20000))
+# "auto" switches to segmented capture above this height (CSS px)
+SEGMENT_THRESHOLD = int(os.environ.get("SEGMENT_THRESHOLD", 8000))
+# Height of each captured clip (CSS px)
+SEGMENT_HEIGHT = int(os.environ.get("SEGMENT_HEIGHT", 2000))
 
-    # Extra wait for layout finishing
-    time.sleep(0.5)
+# Page counts as stable once nothing happened for this long (ms)
+STABILITY_QUIET_MS = int(os.environ.get("STABILITY_QUIET_MS", 500))
+# Hard cap on waiting for stability (ms)
+STABILITY_BUDGET_MS = int(os.environ.get("STABILITY_BUDGET_MS", 10000))
+# Requests open longer than this are treated as long-polling and ignored (ms)
+LONG_REQUEST_MS = 5000
 
+# Installs a MutationObserver on first call, then reports DOM quiet time
+# and images near the viewport that are still loading.
+_QUIESCENCE_JS = """
+() => {
+    if (!window.__quiescence) {
+        const state = { lastMutation: performance.now() };
+        new MutationObserver(() => { state.lastMutation = performance.now(); })
+            .observe(document.documentElement, {
+                childList: true, subtree: true, characterData: true,
+                attributes: true, attributeFilter: ['src', 'srcset']
+            });
+        window.__quiescence = state;
+    }
 
-def scroll_to_bottom(page):
-    """Scroll gradually to let all lazy content render."""
-    page.evaluate("""
-        async () => {
-            await new Promise(resolve => {
-                let totalHeight = 0;
-                const distance = 800;
-                const timer = setInterval(() => {
-                    window.scrollBy(0, distance);
-                    totalHeight += distance;
+    const margin = window.innerHeight;
+    const pendingImages = [...document.images].filter(img => {
+        if (img.complete || !(img.currentSrc || img.src)) return false;
+        if (img.loading !== 'lazy') return true;
+        const rect = img.getBoundingClientRect();
+        return rect.bottom > -margin && rect.top < window.innerHeight + margin;
+    }).length;
 
-                    if (totalHeight >= document.body.scrollHeight - window.innerHeight) {
-                        clearInterval(timer);
-                        resolve();
-                    }
-                }, 150);
-            });
-        }
-    """)
-    time.sleep(1)
+    return {
+        sinceMutation: performance.now() - window.__quiescence.lastMutation,
+        pendingImages: pendingImages
+    };
+}
+"""
 
+# Waits (bounded) for loaded images to finish decoding so they paint
+_DECODE_IMAGES_JS = """
+async (budgetMs) => {
+    const decodes = [...document.images]
+        .filter(img => img.complete && img.naturalWidth > 0)
+        .map(img => img.decode().catch(() => {}));
+    await Promise.race([
+        Promise.all(decodes),
+        new Promise(resolve => setTimeout(resolve, budgetMs))
+    ]);
+}
+"""
 
-def capture_screenshot(url, output_dir="backend/reports/screenshots"):
-    """Capture full-page screenshot with full load + Notion-safe logic."""
 
+class NetworkTracker:
+    """Counts a page's in-flight requests (create before navigation to see them all)."""
+
+    def __init__(self, page):
+        self._started = {}
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_done)
+        page.on("requestfailed", self._on_done)
+
+    def _on_request(self, request):
+        self._started[request] = time.monotonic()
+
+    def _on_done(self, request):
+        self._started.pop(request, None)
+
+    def inflight(self):
+        cutoff = time.monotonic() - LONG_REQUEST_MS / 1000
+        return sum(1 for started in self._started.values() if started >= cutoff)
+
+
+def wait_for_full_load(page, timeout=STABILITY_BUDGET_MS, network=None):
+    """
+    Wait until the page is actually stable: no requests in flight, no DOM
+    mutations and no near-viewport images loading for STABILITY_QUIET_MS,
+    then let decoded images paint. Never waits longer than timeout (ms).
+    """
+    deadline = time.monotonic() + timeout / 1000
+    network = network or NetworkTracker(page)
+
+    try:
+        page.wait_for_load_state("domcontentloaded", timeout=timeout)
+    except Exception:
+        pass
+
+    quiet_since = None
+    while True:
+        state = page.evaluate(_QUIESCENCE_JS)
+        now = time.monotonic()
+
+        busy = (
+            network.inflight() > 0
+            or state["pendingImages"] > 0
+            or state["sinceMutation"] < STABILITY_QUIET_MS
+        )
+        if busy:
+            quiet_since = None
+        elif quiet_since is None:
+            quiet_since = now
+        elif (now - quiet_since) * 1000 >= STABILITY_QUIET_MS:
+            break
+
+        if now >= deadline:
+            print("⏳ Page not stable within budget, capturing anyway.")
+            break
+
+        # wait_for_timeout (not time.sleep) so Playwright keeps dispatching request events
+        page.wait_for_timeout(100)
+
+    remaining_ms = max(0, (deadline - time.monotonic()) * 1000)
+    page.evaluate(_DECODE_IMAGES_JS, min(remaining_ms, 2000))
+
+
+def _new_screenshot_base(url, output_dir):
+    """Path prefix (no extension) shared by a capture's encoded variants."""
     os.makedirs(output_dir, exist_ok=True)
 
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     clean_url = url.replace('https://', '').replace('http://', '').replace('/', '_')[:50]
-    filename = f"{clean_url}_{timestamp}.png"
-    screenshot_path = os.path.join(output_dir, filename)
+    return os.path.join(output_dir, f"{clean_url}_{timestamp}")
 
-    is_notion = "notion.so" in url or "notion.site" in url
+
+def _save_encoded(image, path_base):
+    """Save image as SCREENSHOT_FORMAT, switching to JPEG past WebP's size limit."""
+    fmt = SCREENSHOT_FORMAT
+    if fmt == "webp" and max(image.size) > WEBP_MAX_DIMENSION:
+        fmt = "jpeg"
+
+    path = f"{path_base}.{'jpg' if fmt == 'jpeg' else fmt}"
+    if fmt == "jpeg":
+        image.save(path, "JPEG", quality=SCREENSHOT_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(path, "WEBP", quality=SCREENSHOT_QUALITY, method=4)
+    return path
+
+
+def _resize_to_width(image, width):
+    if image.width <= width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+class SegmentStitcher:
+    """
+    Stitches clip captures into one image as they arrive.
+
+    Each clip is scaled down to SCREENSHOT_MASTER_WIDTH before pasting, so
+    memory stays bounded by the (height-capped) master size instead of
+    one full-resolution bitmap of the whole page.
+    """
+
+    def __init__(self, css_width, css_height):
+        self.scale = min(1.0, SCREENSHOT_MASTER_WIDTH / css_width)
+        size = (max(1, round(css_width * self.scale)), max(1, round(css_height * self.scale)))
+        self.image = Image.new("RGB", size, "white")
+
+    def add(self, png_bytes, css_top):
+        with Image.open(io.BytesIO(png_bytes)) as raw:
+            segment = raw.convert("RGB")
+        if self.scale < 1.0:
+            height = max(1, round(segment.height * self.scale))
+            segment = segment.resize((self.image.width, height), Image.LANCZOS)
+        self.image.paste(segment, (0, round(css_top * self.scale)))
+
+
+def _page_height(page):
+    return page.evaluate(
+        "() => Math.max(document.documentElement.scrollHeight, document.body ? document.body.scrollHeight : 0)"
+    )
+
+
+def capture_segmented(page, height=None):
+    """
+    Capture the page as SEGMENT_HEIGHT clips stitched incrementally.
+
+    Clips are taken relative to the page (no scrolling), so sticky headers
+    are not repeated. Height is capped at SCREENSHOT_MAX_HEIGHT.
+
+    Returns:
+        PIL.Image.Image: stitched capture
+    """
+    width = page.viewport_size["width"]
+    height = min(height or _page_height(page), SCREENSHOT_MAX_HEIGHT)
+    stitcher = SegmentStitcher(width, height)
+
+    for top in range(0, height, SEGMENT_HEIGHT):
+        clip = {"x": 0, "y": top, "width": width, "height": min(SEGMENT_HEIGHT, height - top)}
+        stitcher.add(page.screenshot(clip=clip, full_page=True), top)
+
+    return stitcher.image
+
+
+def capture_loaded_page(page):
+    """
+    Screenshot an already-loaded page, degrading on the same page instead
+    of reloading: full page → segmented → first viewport only.
+
+    Returns:
+        bytes | PIL.Image.Image: raw PNG or stitched image
+    """
+    height = _page_height(page)
+    segmented = CAPTURE_STRATEGY == "segmented" or (
+        CAPTURE_STRATEGY == "auto" and height > min(SEGMENT_THRESHOLD, SCREENSHOT_MAX_HEIGHT)
+    )
+
+    if not segmented:
+        try:
+            return page.screenshot(full_page=True)
+        except Exception as e:
+            print(f"⚠️ Full-page capture failed, retrying segmented on the same page: {e}")
 
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page(viewport={'width': 1920, 'height': 1080})
+        return capture_segmented(page, height)
+    except Exception as e:
+        print(f"⚠️ Segmented capture failed, keeping first viewport only: {e}")
+        return page.screenshot(full_page=False)
+
+
+def encode_screenshot(capture, path_base):
+    """
+    Encode a capture (raw PNG bytes or stitched image) into compressed variants.
+
+    Returns:
+        dict: {"master": path, "preview": path, "thumbnail": path}
+            master    - full capture (SCREENSHOT_MASTER_WIDTH max)
+            preview   - SCREENSHOT_PREVIEW_WIDTH wide, full height
+            thumbnail - top of the page, SCREENSHOT_THUMB_WIDTH wide
+    """
+    if isinstance(capture, Image.Image):
+        image = capture
+    else:
+        with Image.open(io.BytesIO(capture)) as raw:
+            image = raw.convert("RGB")
 
-            if is_notion:
-                page.goto(url, wait_until="domcontentloaded", timeout=45000)
-            else:
-                page.goto(url, wait_until="networkidle", timeout=60000)
+    master = _resize_to_width(image, SCREENSHOT_MASTER_WIDTH)
+    preview = _resize_to_width(master, SCREENSHOT_PREVIEW_WIDTH)
 
-            # Ensure full content load
-            scroll_to_bottom(page)
-            wait_for_full_load(page)
+    thumb_source = image.crop((0, 0, image.width, min(image.height, round(image.width * 1.25))))
+    thumbnail = _resize_to_width(thumb_source, SCREENSHOT_THUMB_WIDTH)
+
+    return {
+        "master": _save_encoded(master, path_base),
+        "preview": _save_encoded(preview, f"{path_base}_preview"),
+        "thumbnail": _save_encoded(thumbnail, f"{path_base}_thumb"),
+    }
+
+
+def _load_and_capture(url, on_loaded=None):
+    """
+    Load url in a pooled browser, let lazy content settle, optionally read
+    the rendered DOM via on_loaded(page), then take the full-page screenshot.
+
+    Capture failures on a loaded page are handled on that same page
+    (capture_loaded_page); a new visit is only made if loading itself failed.
+
+    Returns:
+        (bytes | Image | None, any, dict): capture (None on failure),
+        on_loaded's result and the document response headers
+    """
+    is_notion = "notion.so" in url or "notion.site" in url
+    platform = "notion" if is_notion else None
+
+    def settle_and_capture(page, network):
+        # Ensure full content load
+        scroll_page(page)
+        wait_for_full_load(page, network=network)
+
+        result = on_loaded(page) if on_loaded else None
+        return capture_loaded_page(page), result
+
+    def capture(page):
+        # No "networkidle" here: wait_for_full_load detects real quiescence
+        network = NetworkTracker(page)
+        if is_notion:
+            page.goto(url, wait_until="domcontentloaded", timeout=45000)
+        else:
+            page.goto(url, wait_until="load", timeout=60000)
+        return settle_and_capture(page, network)
 
-            page.screenshot(path=screenshot_path, full_page=True)
-            browser.close()
+    def capture_fallback(page):
+        network = NetworkTracker(page)
+        page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        return settle_and_capture(page, network)
 
-        print(f"✅ Screenshot saved: {screenshot_path}")
-        return screenshot_path
+    try:
+        (capture_bytes, result), headers = browser_pool.run(
+            capture, block="screenshot", platform=platform, return_headers=True,
+            viewport={'width': 1920, 'height': 1080}
+        )
+        return capture_bytes, result, headers
 
     except Exception as e:
         print(f"⚠️ Primary screenshot failed: {e}")
 
-        # FALLBACK
+        # FALLBACK: page failed to load — retry with a lighter load strategy
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page(viewport={'width': 1280, 'height': 720})
-                page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            (capture_bytes, result), headers = browser_pool.run(
+                capture_fallback, block="screenshot", platform=platform, return_headers=True,
+                viewport={'width': 1280, 'height': 720}
+            )
+            return capture_bytes, result, headers
+
+        except Exception as e2:
+            print(f"❌ Fallback screenshot failed: {e2}")
+            return None, None, {}
+
 
-                scroll_to_bottom(page)
-                wait_for_full_load(page)
+def _encode_and_report(url, capture, output_dir):
+    # Encoding runs on the caller's thread so the browser slot is freed first
+    try:
+        variants = encode_screenshot(capture, _new_screenshot_base(url, output_dir))
+    except Exception as e:
+        print(f"❌ Screenshot encoding failed: {e}")
+        return None
 
-                page.screenshot(path=screenshot_path, full_page=True)
-                browser.close()
+    size_kb = sum(os.path.getsize(path) for path in variants.values()) / 1024
+    print(f"✅ Screenshot saved: {variants['master']} ({size_kb:.0f} KB encoded)")
+    return variants
 
-            print(f"✅ Screenshot saved (fallback): {screenshot_path}")
-            return screenshot_path
 
-        except Exception as e2:
-            print(f"❌ Fallback screenshot failed: {e2}")
-            return None
+def _variants_exist(variants):
+    return bool(variants) and all(os.path.exists(path) for path in variants.values())
+
+
+def capture_screenshot(url, output_dir="backend/reports/screenshots"):
+    """
+    Capture full-page screenshot with full load + Notion-safe logic.
+
+    Served from the scrape cache while the page is unchanged and the
+    encoded files still exist.
+
+    Returns:
+        dict | None: encoded variants (see encode_screenshot)
+    """
+    def produce():
+        capture, _, headers = _load_and_capture(url)
+        if capture is None:
+            return None, headers
+        return _encode_and_report(url, capture, output_dir), headers
+
+    return scrape_cache.cached("screenshot", url, produce, is_valid=_variants_exist)
+
+
+def capture_page(url, output_dir="backend/reports/screenshots"):
+    """
+    Load a project page once and return both its scraped data and screenshot.
+
+    The scraped data has the same shape as scrape_project_page() but is read
+    from the rendered DOM, so JS-rendered sites return their real content.
+    Cached together with the screenshot (see capture_screenshot).
+
+    Returns:
+        (dict | None, dict | None): scraped data and screenshot variants
+        (both None if the page could not be loaded)
+    """
+    def produce():
+        capture, scraped_data, headers = _load_and_capture(
+            url, on_loaded=lambda page: extract_from_page(page, url)
+        )
+        if capture is None:
+            return {"scraped_data": None, "screenshots": None}, headers
+        return {
+            "scraped_data": scraped_data,
+            "screenshots": _encode_and_report(url, capture, output_dir),
+        }, headers
+
+    page_data = scrape_cache.cached(
+        "page", url, produce,
+        is_valid=lambda data: bool(data["scraped_data"]) and _variants_exist(data["screenshots"]),
+    )
+    return page_data["scraped_data"], page_data["screenshots"]
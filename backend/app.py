@@ -1,8 +1,11 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import os
-import json
-from main import run_analysis_from_flask
+from jobs import submit_job, get_job, JobQueueFull
+from utils.report_store import get_job_reports, report_view
+from utils import events, scrape_cache, llm_cache, gemini_client, gemini_api, compaction, request_blocking
+from scrapers import tiered
+from analysis import casestudies
 
 # ---------------------------------------
 # PATH SETUP
@@ -50,7 +53,7 @@ def report_screenshots(filename):
     return send_from_directory(SCREENSHOT_FOLDER, filename)
 
 
-# Main analysis endpoint
+# Main analysis endpoint (returns a job ID immediately)
 @app.route("/analyze", methods=["POST"])
 def analyze():
     portfolio_url = request.form.get("portfolioUrl")
@@ -66,94 +69,85 @@ def analyze():
     resume_path = os.path.join(UPLOAD_FOLDER, safe_name)
     resume.save(resume_path)
 
-    # Clear old JSON reports
-    for file in os.listdir(REPORT_FOLDER):
-        if file.endswith(".json"):
-            try:
-                os.remove(os.path.join(REPORT_FOLDER, file))
-            except:
-                pass
+    # Queue backend pipeline (runs on the background worker pool)
+    try:
+        job_id = submit_job(portfolio_url, resume_path)
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+
+    return jsonify({
+        "message": "analysis_queued",
+        "job_id": job_id,
+        "status_url": f"/jobs/{job_id}"
+    }), 202
+
+
+# Job status + results
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+
+# Live progress + per-project reports (Server-Sent Events)
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    if not events.exists(job_id):
+        return jsonify({"error": "Job not found"}), 404
 
-    # Run backend pipeline
     try:
-        run_analysis_from_flask(portfolio_url, resume_path)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        last_event_id = int(request.headers.get("Last-Event-ID", 0))
+    except ValueError:
+        last_event_id = 0
 
-    return jsonify({"message": "analysis_complete"})
+    return Response(
+        stream_with_context(events.sse_stream(job_id, last_event_id)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
-# Fetch all JSON reports
+# Fetch reports for one job (the job ID is required: jobs are not shared)
 @app.route("/reports", methods=["GET"])
 def get_reports():
+    job_id = request.args.get("job")
+    if not job_id:
+        return jsonify({"error": "job is required"}), 400
+
     results = []
-    report_files = sorted(os.listdir(REPORT_FOLDER))
-
-    for file in report_files:
-
-        if not file.endswith(".json"):
-            continue
-
-        file_path = os.path.join(REPORT_FOLDER, file)
-        with open(file_path, "r", encoding="utf-8") as f:
-            raw = json.load(f)
-
-        analysis = raw.get("analysis", {})
-
-        # screenshot normalization
-        screenshot_raw = raw.get("screenshot")
-        screenshot_url = None
-        if screenshot_raw:
-            screenshot_url = f"/reports/screenshots/{os.path.basename(screenshot_raw)}"
-
-        # -------------------------
-        # PORTFOLIO
-        # -------------------------
-        if "structured_content" in raw:
-
-            structured = raw.get("structured_content", {})
-
-            results.append({
-                "type": "portfolio",
-                "url": raw.get("url", ""),
-                "hero": structured.get("hero", ""),
-                "about": structured.get("about", ""),
-                "skills": structured.get("skills", []),
-                "projects": structured.get("projects", []),
-                "contact": structured.get("contact", {}),
-                "links": structured.get("all_links", []),
-
-                # FIXED KEYS
-                "overall_feedback": analysis.get("overall_feedback")
-                                   or analysis.get("overall score")
-                                   or "",
-                "sections": analysis.get("section_wise", [])
-            })
-
-        # -------------------------
-        # CASE STUDY
-        # -------------------------
-        elif "scraped_data" in raw or "projectDetails" in raw or "analysis" in raw:
-
-
-            results.append({
-                "type": "case_study",
-                "url": raw.get("url", ""),
-                "title": raw.get("scraped_data", {}).get("title", "Untitled Case Study"),
-
-                # FIXED KEYS (camelCase)
-                "overallScore": analysis.get("overall_score", 0),
-                "phaseScores": analysis.get("phase_scores", []),
-                "summary": analysis.get("summary", ""),
-                "ux_keywords": analysis.get("ux_keywords", []),
-                "improvements": analysis.get("improvements", []),
-                "verdict": analysis.get("verdict", ""),
-                "screenshot": screenshot_url
-            })
+    for raw in get_job_reports(job_id):
+        view = report_view(raw)
+        if view:
+            results.append(view)
 
     return jsonify(results)
 
 
+# Scrape cache size and hit/miss counters (for tuning SCRAPE_CACHE_TTL)
+# plus how often static HTML was enough to skip the browser, what the
+# browser's request blocking saved, and the LLM cache
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    stats = scrape_cache.stats()
+    stats["fetch_tiers"] = tiered.stats()
+    stats["request_blocking"] = request_blocking.totals()
+    stats["llm"] = llm_cache.stats()
+    return jsonify(stats)
+
+
+# Gemini call, retry, throttling, token and latency totals
+@app.route("/llm/stats", methods=["GET"])
+def llm_stats():
+    return jsonify({
+        **gemini_client.stats(),
+        "compaction": compaction.stats(),
+        "scoring": casestudies.scoring_stats(),
+        "output": gemini_api.stats(),
+    })
+
+
 # ---------------------------------------
 # RAILWAY ENTRY POINT
 # ---------------------------------------
@@ -1,30 +1,28 @@
 """
 Handles scraping based on platform type and coordinates Gemini analysis
 """
-import os
 import json
-from urllib.parse import urlparse
 
-from scrapers import behance, designfolio, notion, normal_scraper
+from scrapers import tiered
 from analysis import casestudies
 from utils.gemini_api import analyze_content
+from utils import report_store, events, compaction, schemas
 
 
-def get_clean_filename(url):
-    """Extract clean filename from URL"""
-    parsed = urlparse(url)
-    domain = parsed.netloc.replace('.', '_')
-    return domain or "portfolio"
+def extract_portfolio(url, platform, job_id):
+    """
+    Scrape portfolio → Send to Gemini → Save portfolio report → Extract project links → Analyze each project
 
+    Project pages the scraper found are captured speculatively while the
+    portfolio prompt runs, then reconciled with Gemini's project list.
 
-def extract_portfolio(url, platform):
-    """
-    Scrape portfolio → Send to Gemini → Save portfolio JSON → Extract project links → Analyze each project
+    Reports are written to the report store under job_id.
 
     Returns:
         {
             "success": True,
-            "main_report": "reports/xxx.json",
+            "job_id": "...",
+            "main_report": <report store row ID>,
             "structured_content": {...},
             "analysis": {...},
             "project_links": [...],
@@ -34,21 +32,20 @@ def extract_portfolio(url, platform):
     print(f"📥 Extracting portfolio data from {platform}...")
 
     # --------------------------
-    # 1. SCRAPE BASED ON PLATFORM
+    # 1. SCRAPE BASED ON PLATFORM (static HTML first, browser if needed)
     # --------------------------
-    if platform == "behance":
-        scraped_data = behance.extract(url)
-    elif platform == "designfolio":
-        scraped_data = designfolio.extract(url)
-    elif platform == "notion":
-        scraped_data = notion.extract(url)
-    else:
-        scraped_data = normal_scraper.extract(url)
+    scraped_data = tiered.fetch_portfolio(url, platform)
 
     if not scraped_data:
         return {"success": False, "error": "Failed to scrape portfolio"}
 
     print("✅ Portfolio data extracted\n")
+    events.stage(job_id, "portfolio_scraped", "Portfolio scraped, analyzing with Gemini...")
+
+    # Start capturing the pages the scraper already found while Gemini runs
+    prefetcher = None
+    if casestudies.PREFETCH_PROJECTS and scraped_data.get("project_links"):
+        prefetcher = casestudies.ProjectPrefetcher(scraped_data["project_links"], job_id)
 
     # --------------------------
     # 2. RUN GEMINI MAIN-PAGE PROMPT
@@ -56,6 +53,7 @@ def extract_portfolio(url, platform):
 
     print("🧠 Analyzing portfolio with Gemini...")
 
+    prompt_data = compaction.compact_portfolio(scraped_data)
     prompt = f"""
 You are an expert UI/UX portfolio analyzer.
 
@@ -63,11 +61,11 @@ Analyze this portfolio based on the extracted content and links.
 
 URL: {url}
 
-TEXT CONTENT (first 2000 chars):
-{json.dumps(scraped_data.get('content', '')[:2000], indent=2)}
+TEXT CONTENT (repeats and boilerplate removed; "…" marks omitted passages):
+{json.dumps(prompt_data['content'], ensure_ascii=False)}
 
-ANCHOR LINKS (first 50):
-{json.dumps(scraped_data.get('links', [])[:50], indent=2)}
+ANCHOR LINKS (de-duplicated, first 50):
+{json.dumps(prompt_data['links'], ensure_ascii=False)}
 
 Return ONLY valid JSON (no markdown, no descriptions). Use EXACTLY this format:
 
@@ -103,7 +101,7 @@ Return ONLY valid JSON (no markdown, no descriptions). Use EXACTLY this format:
   }},
 
   "analysis": {{
-    "overall score": "xx/100"
+    "overall score": "xx/100",
     "overall_feedback": "",
     "section_wise": [
       {{
@@ -118,30 +116,33 @@ Return ONLY valid JSON (no markdown, no descriptions). Use EXACTLY this format:
 """
 
     try:
-        gemini_response = analyze_content(prompt, scraped_data)
+        gemini_response = analyze_content(prompt, prompt_data, schema=schemas.PORTFOLIO_SCHEMA)
         print("✅ Gemini analysis successful\n")
+        events.stage(job_id, "gemini_main_done", "Portfolio analysis done")
     except Exception as e:
         print(f"❌ Gemini failed: {e}")
+        if prefetcher is not None:
+            prefetcher.close()
         return {"success": False, "error": "Gemini main analysis failed"}
 
     # --------------------------
     # 3. SAVE MAIN REPORT
     # --------------------------
-    filename = get_clean_filename(url)
-    main_json_path = f"backend/reports/{filename}_main_portfolio.json"
+    main_report_id = report_store.save_report(
+        job_id, url, report_store.PORTFOLIO, gemini_response
+    )
 
-    with open(main_json_path, "w", encoding="utf-8") as f:
-        json.dump(gemini_response, f, indent=2, ensure_ascii=False)
-
-    print(f"📁 Main portfolio report saved: {main_json_path}\n")
+    print(f"📁 Main portfolio report saved: job {job_id} (#{main_report_id})\n")
+    events.report(job_id, gemini_response, 0, "Portfolio report ready")
 
     # --------------------------
     # 4. EXTRACT PROJECT LINKS (NEW LOGIC)
     # --------------------------
     print("🔗 Extracting project links from structured_content.projects...")
 
-    structured = gemini_response.get("structured_content", {})
-    projects = structured.get("projects", [])
+    structured = gemini_response.get("structured_content")
+    projects = structured.get("projects") if isinstance(structured, dict) else None
+    projects = projects if isinstance(projects, list) else []
 
     project_links = [
         p.get("url") for p in projects
@@ -149,7 +150,14 @@ Return ONLY valid JSON (no markdown, no descriptions). Use EXACTLY this format:
     ]
 
     project_links = list(dict.fromkeys(project_links))  # remove duplicates
+
+    if not project_links and scraped_data.get("project_links"):
+        print("⚠️ Gemini listed no projects, using the scraper's project links")
+        project_links = list(dict.fromkeys(scraped_data["project_links"]))
+
     print(f"✅ Found {len(project_links)} project links\n")
+    events.stage(job_id, "projects_found", f"Found {len(project_links)} projects",
+                 total=len(project_links))
 
     # --------------------------
     # 5. ANALYZE EACH PROJECT PAGE
@@ -158,17 +166,22 @@ Return ONLY valid JSON (no markdown, no descriptions). Use EXACTLY this format:
 
     if project_links:
         print("📊 Analyzing individual projects...\n")
-        project_reports_count = casestudies.analyze_projects(project_links, url)
+        project_reports_count = casestudies.analyze_projects(
+            project_links, url, job_id, prefetcher=prefetcher
+        )
         print(f"🎉 Completed {project_reports_count} project analyses\n")
     else:
         print("⚠️ No project links found to analyze\n")
+        if prefetcher is not None:
+            prefetcher.close()
 
     # --------------------------
     # 6. RETURN FINAL RESULT
     # --------------------------
     return {
         "success": True,
-        "main_report": main_json_path,
+        "job_id": job_id,
+        "main_report": main_report_id,
         "structured_content": gemini_response.get("structured_content", {}),
         "analysis": gemini_response.get("analysis", {}),
         "project_links": project_links,
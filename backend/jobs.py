@@ -0,0 +1,123 @@
+"""
+Background job runner for portfolio analyses
+Accepts submissions from Flask, runs them on a bounded worker pool
+and keeps track of status/results by job ID.
+"""
+import os
+import uuid
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from main import run_analysis_from_flask
+from utils import events
+
+# ---------------------------------------
+# CONFIG
+# ---------------------------------------
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+MAX_PENDING_JOBS = int(os.environ.get("MAX_PENDING_JOBS", 20))
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", 6 * 60 * 60))
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="analysis-job")
+_jobs = {}
+_lock = threading.Lock()
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting for a worker."""
+
+
+def _now():
+    return datetime.now().isoformat()
+
+
+def _prune_finished_jobs():
+    """Forget finished jobs older than JOB_RETENTION_SECONDS (caller holds the lock)."""
+    cutoff = time.time() - JOB_RETENTION_SECONDS
+    expired = [
+        job_id for job_id, job in _jobs.items()
+        if job["status"] in ("completed", "failed") and job["_finished_ts"] < cutoff
+    ]
+    for job_id in expired:
+        del _jobs[job_id]
+
+
+def _update(job_id, **fields):
+    with _lock:
+        job = _jobs.get(job_id)
+        if job:
+            job.update(fields)
+
+
+def _run_job(job_id, url, resume_path):
+    """Worker entry point: run the full pipeline and record the outcome."""
+    _update(job_id, status="running", started_at=_now())
+    events.stage(job_id, "started", "Connecting to portfolio...")
+    print(f"🚀 Job {job_id} started: {url}")
+
+    try:
+        result = run_analysis_from_flask(url, resume_path, job_id=job_id)
+    except Exception as e:
+        print(f"❌ Job {job_id} crashed: {e}")
+        _update(job_id, status="failed", error=str(e),
+                finished_at=_now(), _finished_ts=time.time())
+        events.close(job_id, "failed", str(e))
+        return
+
+    if result and result.get("success"):
+        _update(job_id, status="completed", result=result,
+                finished_at=_now(), _finished_ts=time.time())
+        events.close(job_id, "completed")
+        print(f"✅ Job {job_id} completed")
+    else:
+        error = (result or {}).get("error", "Analysis failed")
+        _update(job_id, status="failed", error=error, result=result,
+                finished_at=_now(), _finished_ts=time.time())
+        events.close(job_id, "failed", error)
+        print(f"❌ Job {job_id} failed: {error}")
+
+
+def submit_job(url, resume_path=None):
+    """
+    Enqueue a portfolio analysis.
+
+    Returns:
+        str: job ID
+
+    Raises:
+        JobQueueFull: if MAX_PENDING_JOBS jobs are already queued
+    """
+    with _lock:
+        _prune_finished_jobs()
+
+        pending = sum(1 for job in _jobs.values() if job["status"] == "queued")
+        if pending >= MAX_PENDING_JOBS:
+            raise JobQueueFull("Too many analyses in progress, please retry shortly")
+
+        job_id = uuid.uuid4().hex
+        _jobs[job_id] = {
+            "id": job_id,
+            "status": "queued",
+            "portfolio_url": url,
+            "submitted_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            "_finished_ts": None,
+        }
+
+    events.stage(job_id, "queued", "Waiting for an analysis slot...")
+    _executor.submit(_run_job, job_id, url, resume_path)
+    return job_id
+
+
+def get_job(job_id):
+    """Return a public snapshot of a job, or None if unknown/expired."""
+    with _lock:
+        job = _jobs.get(job_id)
+        if not job:
+            return None
+        return {k: v for k, v in job.items() if not k.startswith("_")}
@@ -6,13 +6,14 @@ and runs the complete analysis pipeline without input() or prints.
 
 from main_page import process_main_url
 
-def run_analysis_from_flask(url, resume_path=None):
+def run_analysis_from_flask(url, resume_path=None, job_id=None):
     """
     This function replaces the old CLI workflow.
     
     Parameters:
         url (str): Portfolio URL given by Flask
         resume_path (str): Path to uploaded resume (optional)
+        job_id (str): Job namespace reports are stored under (optional)
     
     Returns:
         dict: result of processing, same structure as before
@@ -26,7 +27,7 @@ def run_analysis_from_flask(url, resume_path=None):
     # For example — if Gemini API uses the resume for context:
     # result = process_main_url(url, resume_path=resume_path)
 
-    result = process_main_url(url)
+    result = process_main_url(url, job_id=job_id)
 
     return result
 
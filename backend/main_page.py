@@ -4,6 +4,7 @@ Updated to support new portfolio-level JSON structure (structured_content + anal
 """
 
 import os
+import uuid
 from final import extract_portfolio
 
 
@@ -29,7 +30,7 @@ def identify_platform(url):
         return "other"
 
 
-def process_main_url(url):
+def process_main_url(url, job_id=None):
     """
     Main processing function:
     - Identify platform
@@ -39,11 +40,13 @@ def process_main_url(url):
 
     Args:
         url (str): Portfolio URL to analyze
+        job_id (str): Report namespace (a fresh one is created if omitted)
 
     Returns:
         dict: {
             "success": bool,
-            "main_report": "path/to/json",
+            "job_id": str,
+            "main_report": int (report store row ID),
             "structured_content": {...},
             "analysis": {...},
             "project_links": [...],
@@ -51,6 +54,8 @@ def process_main_url(url):
         }
     """
 
+    job_id = job_id or uuid.uuid4().hex
+
     print(f"🔍 Identifying platform type...")
     platform = identify_platform(url)
     print(f"✅ Platform detected: {platform.upper()}\n")
@@ -61,12 +66,13 @@ def process_main_url(url):
 
     # Call final.py (your main orchestrator)
     print("📥 Extracting portfolio data...")
-    result = extract_portfolio(url, platform)
+    result = extract_portfolio(url, platform, job_id=job_id)
 
     # result must now return:
     # {
     #   "success": True,
-    #   "main_report": "...",
+    #   "job_id": "...",
+    #   "main_report": <report id>,
     #   "structured_content": {...},
     #   "analysis": {...},
     #   "project_links": [...],
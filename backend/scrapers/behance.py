@@ -2,9 +2,10 @@
 Behance portfolio scraper using Playwright
 """
 import os
-import json
-from urllib.parse import urljoin
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.sync_api import TimeoutError
+
+from scrapers import dom_extract
+from utils import browser_pool, scrape_cache
 
 def safe_goto(page, url, timeout=60000):
     """Navigate to URL with fallback strategies"""
@@ -19,59 +20,55 @@ def safe_goto(page, url, timeout=60000):
             page.goto(url, timeout=timeout)
             page.wait_for_timeout(3000)
 
-def extract(url):
-    """Extract content and links from Behance portfolio"""
-    print(f"  🎨 Scraping Behance: {url}")
-
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            storage_file = "behance_storage.json"
-            if os.path.exists(storage_file):
-                context = browser.new_context(storage_state=storage_file)
-            else:
-                context = browser.new_context()
-
-            page = context.new_page()
-            safe_goto(page, url)
-            context.storage_state(path=storage_file)
+def project_links_from(links):
+    """Behance project pages are the /gallery/ links"""
+    return list(set(link["href"] for link in links if '/gallery/' in link["href"]))
 
-            anchors = page.locator("a")
-            count = anchors.count()
-            links_list = []
-            project_links = []
+def parse_static(url, page, html):
+    """Static-tier parser (see scrapers.tiered); None unless project links are in the HTML"""
+    project_links = project_links_from(page['links'])
+    if not project_links:
+        return None
 
-            for i in range(min(count, 500)):
-                try:
-                    text = anchors.nth(i).inner_text().strip()
-                    href = anchors.nth(i).get_attribute("href")
+    return {
+        'url': url,
+        'content': page['text'][:5000],
+        'links': page['links'][:100],
+        'project_links': project_links
+    }
 
-                    if not href:
-                        continue
-
-                    absolute_url = urljoin(url, href)
-                    links_list.append({"text": text, "href": absolute_url})
-
-                    if '/gallery/' in absolute_url:
-                        project_links.append(absolute_url)
+def extract(url):
+    """Extract content and links from Behance portfolio"""
+    print(f"  🎨 Scraping Behance: {url}")
 
-                except Exception:
-                    continue
+    storage_file = "behance_storage.json"
+    context_options = {}
+    if os.path.exists(storage_file):
+        context_options["storage_state"] = storage_file
 
-            try:
-                full_text = page.inner_text("body")
-            except Exception:
-                full_text = ""
+    def scrape(page):
+        safe_goto(page, url)
+        page.context.storage_state(path=storage_file)
 
-            browser.close()
+        # One evaluate call instead of ~1,000 per-anchor round trips
+        data = dom_extract.extract(page, fields=("links", "text"), max_links=500)
+        links_list = data["links"]
+        full_text = data["text"]
 
-            return {
-                'url': url,
-                'content': full_text[:5000],
-                'links': links_list[:100],
-                'project_links': list(set(project_links))
-            }
+        return {
+            'url': url,
+            'content': full_text[:5000],
+            'links': links_list[:100],
+            'project_links': project_links_from(links_list)
+        }
 
+    try:
+        return scrape_cache.cached(
+            "extract:behance", url,
+            lambda: browser_pool.run(scrape, block="text", platform="behance",
+                                     return_headers=True, **context_options),
+            is_valid=lambda data: bool(data.get('content')),
+        )
     except Exception as e:
         print(f"  ❌ Behance scraping error: {str(e)}")
         return {'url': url, 'content': '', 'links': [], 'project_links': []}
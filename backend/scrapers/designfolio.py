@@ -1,8 +1,34 @@
 """
-Designfolio portfolio scraper using Playwright
+Designfolio portfolio scraper
+Designfolio is a Next.js site: the portfolio's projects are embedded in
+__NEXT_DATA__ in the server HTML, and project pages are served as JSON
+from /_next/data/<buildId>/... routes. Both are read without a browser;
+Playwright is only used when the data is not available that way.
 """
+import re
 import json
-from playwright.sync_api import sync_playwright
+import html
+import threading
+from urllib.parse import urlsplit
+
+from scrapers import dom_extract
+from utils import browser_pool, http_client, scrape_cache
+from utils.scrolling import scroll_page
+
+_NEXT_DATA_RE = re.compile(
+    rb'<script[^>]+id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.S | re.I
+)
+_TAG_RE = re.compile(r'<[^>]+>')
+_OBJECT_ID_RE = re.compile(r'^[0-9a-f]{24}$')
+_IMAGE_RE = re.compile(r'\.(png|jpe?g|gif|webp|avif|svg)(\?|$)', re.I)
+
+# Keys holding identifiers/metadata rather than readable content
+_SKIP_KEYS = {"_id", "id", "__v", "slug", "createdAt", "updatedAt", "userId",
+              "user", "type", "key", "url", "href", "link", "color", "theme"}
+_HEADING_KEYS = {"title", "heading", "subtitle", "name"}
+
+_build_ids = {}  # origin -> Next.js buildId seen in that site's __NEXT_DATA__
+_build_ids_lock = threading.Lock()
 
 def find_projects_recursive(obj):
     """Recursively search for 'projects' key in nested JSON"""
@@ -20,47 +46,247 @@ def find_projects_recursive(obj):
                 return result
     return None
 
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+def _remember_build_id(url, next_json):
+    build_id = next_json.get("buildId")
+    if build_id:
+        with _build_ids_lock:
+            _build_ids[_origin(url)] = build_id
+
+def restore_build_id(url, data):
+    """
+    Learn the buildId carried in a (possibly scrape-cached) portfolio
+    result, so cache hits still enable the data route. Removes the key
+    before the data reaches the prompt. Returns data.
+    """
+    if isinstance(data, dict):
+        _remember_build_id(url, {"buildId": data.pop("build_id", None)})
+    return data
+
+def parse_next_data(raw_html):
+    """__NEXT_DATA__ JSON from raw HTML bytes, or None"""
+    match = _NEXT_DATA_RE.search(raw_html)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except ValueError:
+        return None
+
+def project_links_from(url, next_json):
+    """Project page URLs for every project listed in __NEXT_DATA__"""
+    projects = find_projects_recursive(next_json) or []
+    return [
+        f"{url.rstrip('/')}/project/{proj['_id']}"
+        for proj in projects if isinstance(proj, dict) and "_id" in proj
+    ]
+
+def parse_static(url, page, raw_html):
+    """Static-tier parser (see scrapers.tiered): projects from __NEXT_DATA__ in the server HTML"""
+    next_json = parse_next_data(raw_html)
+    if not next_json:
+        return None
+
+    project_links = project_links_from(url, next_json)
+    if not project_links:
+        return None
+
+    # Project titles + URLs as anchors, so the portfolio prompt sees them
+    projects = [
+        proj for proj in find_projects_recursive(next_json)
+        if isinstance(proj, dict) and "_id" in proj
+    ]
+    project_anchors = [
+        {'text': proj.get('title') or proj.get('name') or '', 'href': link}
+        for proj, link in zip(projects, project_links)
+    ]
+    content = page['text'] or ' '.join(a['text'] for a in project_anchors if a['text'])
+
+    return {
+        'url': url,
+        'content': content[:5000],
+        'links': (project_anchors + page['links'])[:100],
+        'project_links': project_links,
+        'build_id': next_json.get('buildId')
+    }
+
 def extract(url):
-    """Extract projects from Designfolio portfolio"""
+    """Extract projects from Designfolio portfolio (browser path)"""
     print(f"  📱 Scraping Designfolio: {url}")
 
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(url, wait_until="domcontentloaded", timeout=60000)
-
-            for _ in range(10):
-                page.mouse.wheel(0, 3000)
-                page.wait_for_timeout(300)
-
-            try:
-                script_data = page.locator("script#__NEXT_DATA__").inner_text()
-                next_json = json.loads(script_data)
-                projects = find_projects_recursive(next_json)
-
-                project_links = []
-                if projects:
-                    for proj in projects:
-                        if "_id" in proj:
-                            project_url = f"{url.rstrip('/')}/project/{proj['_id']}"
-                            project_links.append(project_url)
-
-                content = page.inner_text("body")
-                browser.close()
-
-                return {
-                    'url': url,
-                    'content': content[:5000],
-                    'links': [],
-                    'project_links': project_links
-                }
-
-            except Exception as e:
-                print(f"  ⚠️  Could not parse __NEXT_DATA__: {e}")
-                browser.close()
-                return {'url': url, 'content': '', 'links': [], 'project_links': []}
+    def scrape(page):
+        page.goto(url, wait_until="domcontentloaded", timeout=60000)
+
+        scroll_page(page, budget_ms=3000)
+
+        data = dom_extract.extract(page, fields=("text", "json"))
+
+        try:
+            next_json = json.loads(data["json"]["__NEXT_DATA__"])
+            content = data["text"]
+
+            return {
+                'url': url,
+                'content': content[:5000],
+                'links': [],
+                'project_links': project_links_from(url, next_json),
+                'build_id': next_json.get('buildId')
+            }
 
+        except Exception as e:
+            print(f"  ⚠️  Could not parse __NEXT_DATA__: {e}")
+            return {'url': url, 'content': '', 'links': [], 'project_links': []}
+
+    try:
+        return restore_build_id(url, scrape_cache.cached(
+            "extract:designfolio", url,
+            lambda: browser_pool.run(scrape, block="text", platform="designfolio",
+                                     return_headers=True),
+            is_valid=lambda data: bool(data.get('content')),
+        ))
     except Exception as e:
         print(f"  ❌ Designfolio scraping error: {str(e)}")
         return {'url': url, 'content': '', 'links': [], 'project_links': []}
+
+# ---------------------------------------
+# PROJECT PAGES VIA NEXT.JS DATA ROUTES
+# ---------------------------------------
+
+def is_project_url(url):
+    """True for Designfolio project pages (…/project/<id>)"""
+    return "designfolio" in url.lower() and "/project/" in urlsplit(url).path
+
+def _find_by_id(obj, object_id):
+    if isinstance(obj, dict):
+        if obj.get("_id") == object_id:
+            return obj
+        values = obj.values()
+    elif isinstance(obj, list):
+        values = obj
+    else:
+        return None
+    for value in values:
+        found = _find_by_id(value, object_id)
+        if found is not None:
+            return found
+    return None
+
+def _walk_strings(obj, key=None):
+    """Yield (key, string) for every string value in nested JSON"""
+    if isinstance(obj, str):
+        yield key, obj
+    elif isinstance(obj, dict):
+        for k, value in obj.items():
+            if k not in _SKIP_KEYS:
+                yield from _walk_strings(value, k)
+    elif isinstance(obj, list):
+        for value in obj:
+            yield from _walk_strings(value, key)
+
+def project_to_scraped_data(url, page_props):
+    """
+    Build the scrape_project_page result from a project page's pageProps.
+
+    Returns:
+        dict | None: None if the payload has no readable content
+    """
+    project_id = urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1]
+    project = _find_by_id(page_props, project_id) or page_props
+
+    title = ""
+    headings, texts = [], []
+    total_images = 0
+
+    for key, value in _walk_strings(project):
+        value = value.strip()
+        if _IMAGE_RE.search(value) and " " not in value:
+            total_images += 1
+            continue
+        if len(value) < 2 or value.startswith(("http://", "https://")) or _OBJECT_ID_RE.match(value):
+            continue
+
+        text = " ".join(html.unescape(_TAG_RE.sub(" ", value)).split())
+        if not text:
+            continue
+        if key in _HEADING_KEYS:
+            if not title:
+                title = text
+            headings.append({'level': 'h2', 'text': text})
+        texts.append(text)
+
+    text_content = " ".join(texts)
+    if not text_content:
+        return None
+
+    return {
+        'url': url,
+        'title': title,
+        'meta_description': '',
+        'headings': headings,
+        'text_content': text_content,
+        'full_text_length': len(text_content),
+        'total_images': total_images
+    }
+
+def _fetch_project_html(url):
+    """Project page HTML → its own __NEXT_DATA__ pageProps (also learns the buildId)"""
+    def parse(response):
+        next_json = parse_next_data(response.content)
+        if not next_json:
+            return None
+        _remember_build_id(url, next_json)
+        return project_to_scraped_data(url, next_json.get("props", {}).get("pageProps", {}))
+
+    return scrape_cache.cached_fetch("designfolio:project_html", url, parse,
+                                     max_bytes=http_client.HTML_MAX_BYTES)
+
+def _fetch_project_data(url, build_id):
+    """Project JSON from /_next/data/<buildId>/<path>.json"""
+    parts = urlsplit(url)
+    data_url = f"{_origin(url)}/_next/data/{build_id}{parts.path.rstrip('/')}.json"
+    if parts.query:
+        data_url += f"?{parts.query}"
+
+    def parse(response):
+        payload = json.loads(response.content)
+        return project_to_scraped_data(url, payload.get("pageProps", {}))
+
+    return scrape_cache.cached_fetch("designfolio:project_data", data_url, parse)
+
+def fetch_project(url):
+    """
+    Structured project content without rendering.
+
+    Uses the Next.js data route when the site's buildId is known (it is
+    learned while scraping the portfolio), else the project page's own
+    __NEXT_DATA__. A stale buildId (404 after a redeploy) falls back to
+    the HTML, which refreshes it.
+
+    Returns:
+        dict | None: scrape_project_page-shaped data, or None when neither
+        source has it (caller should use the browser)
+    """
+    with _build_ids_lock:
+        build_id = _build_ids.get(_origin(url))
+
+    if build_id:
+        try:
+            data = _fetch_project_data(url, build_id)
+            if data:
+                print(f"    ⚡ Designfolio project read from Next.js data route: {url}")
+                return data
+        except Exception as e:
+            print(f"    ⚠️  Next.js data route unavailable ({e}), trying page HTML")
+
+    try:
+        data = _fetch_project_html(url)
+    except Exception as e:
+        print(f"    ⚠️  Designfolio project HTML unavailable: {e}")
+        return None
+
+    if data:
+        print(f"    ⚡ Designfolio project read from __NEXT_DATA__: {url}")
+    return data
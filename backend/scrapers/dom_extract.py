@@ -0,0 +1,119 @@
+"""
+Batched DOM extraction for Playwright scrapers
+Reads links, text, headings, images and embedded JSON in a single
+page.evaluate() call instead of one browser round trip per element.
+"""
+
+MAX_LINKS = 500
+MAX_TEXT_CHARS = 50000
+MAX_HEADINGS = 200
+MAX_IMAGES = 200
+MAX_JSON_CHARS = 5_000_000
+
+ALL_FIELDS = ("meta", "links", "text", "main_text", "headings", "images", "json")
+
+_EXTRACT_JS = """
+(opts) => {
+    const want = new Set(opts.fields);
+    const clean = s => (s || '').replace(/\\s+/g, ' ').trim();
+    const out = {};
+
+    if (want.has('meta')) {
+        const titleEl = document.querySelector('title');
+        const h1 = document.querySelector('h1');
+        const meta = document.querySelector('meta[name="description"]');
+        out.title = titleEl ? clean(titleEl.textContent) : (h1 ? clean(h1.textContent) : '');
+        out.meta_description = meta ? (meta.getAttribute('content') || '') : '';
+    }
+
+    if (want.has('links')) {
+        out.links = [];
+        for (const a of document.querySelectorAll('a[href]')) {
+            if (out.links.length >= opts.maxLinks) break;
+            out.links.push({ text: clean(a.innerText), href: a.href });
+        }
+    }
+
+    // Rendered text, as page.inner_text("body") would return it
+    if (want.has('text')) {
+        out.text = document.body ? document.body.innerText.slice(0, opts.maxText) : '';
+    }
+
+    // Text without scripts and page chrome (nav/header/footer)
+    if (want.has('main_text')) {
+        let text = '';
+        if (document.body) {
+            const body = document.body.cloneNode(true);
+            body.querySelectorAll('script, style, noscript, nav, footer, header').forEach(el => el.remove());
+            text = clean(body.textContent);
+        }
+        out.main_text = text.slice(0, opts.maxText);
+    }
+
+    if (want.has('headings')) {
+        out.headings = [];
+        for (const tag of ['h1', 'h2', 'h3', 'h4']) {
+            for (const el of document.querySelectorAll(tag)) {
+                if (out.headings.length >= opts.maxHeadings) break;
+                out.headings.push({ level: tag, text: clean(el.textContent) });
+            }
+        }
+    }
+
+    if (want.has('images')) {
+        out.total_images = document.images.length;
+        out.images = [...document.images].slice(0, opts.maxImages).map(img => ({
+            src: img.currentSrc || img.src,
+            alt: img.alt || '',
+            width: img.naturalWidth,
+            height: img.naturalHeight
+        }));
+    }
+
+    // Embedded JSON payloads (__NEXT_DATA__, ld+json, ...) as raw strings
+    if (want.has('json')) {
+        out.json = {};
+        const scripts = document.querySelectorAll(
+            'script[type="application/json"], script[type="application/ld+json"], script#__NEXT_DATA__'
+        );
+        scripts.forEach((el, i) => {
+            const raw = el.textContent || '';
+            if (raw.length <= opts.maxJson) {
+                out.json[el.id || `${el.type || 'script'}#${i}`] = raw;
+            }
+        });
+    }
+
+    return out;
+}
+"""
+
+
+def extract(page, fields=ALL_FIELDS, max_links=MAX_LINKS, max_text=MAX_TEXT_CHARS,
+            max_headings=MAX_HEADINGS, max_images=MAX_IMAGES, max_json=MAX_JSON_CHARS):
+    """
+    Extract page data in one browser round trip.
+
+    Args:
+        page: Loaded Playwright page
+        fields (tuple): Any of ALL_FIELDS
+            meta      -> title, meta_description
+            links     -> links [{text, href}] (absolute hrefs)
+            text      -> text (rendered body text)
+            main_text -> main_text (body text without nav/header/footer/scripts)
+            headings  -> headings [{level, text}] (h1-h4)
+            images    -> images [{src, alt, width, height}], total_images
+            json      -> json {script id: raw JSON string}; oversized payloads are skipped
+        max_*: Size caps applied inside the page
+
+    Returns:
+        dict: requested fields
+    """
+    return page.evaluate(_EXTRACT_JS, {
+        "fields": list(fields),
+        "maxLinks": max_links,
+        "maxText": max_text,
+        "maxHeadings": max_headings,
+        "maxImages": max_images,
+        "maxJson": max_json,
+    })
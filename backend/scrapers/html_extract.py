@@ -0,0 +1,232 @@
+"""
+Single-pass HTML extraction for plain-HTTP scrapers
+Collects title, meta description, headings, links, image count and text
+in one traversal of the document, without building a tree. Uses lxml's
+C parser when installed and the stdlib html.parser otherwise.
+"""
+import re
+import codecs
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+MAX_TEXT_CHARS = 50000
+MAX_LINKS = 500
+
+HEADING_TAGS = ("h1", "h2", "h3", "h4")
+# Never part of the visible text
+ALWAYS_SKIPPED = {"script", "style", "noscript", "template", "svg"}
+# Page chrome, excluded from the text of project pages
+CHROME_TAGS = {"nav", "header", "footer"}
+
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+META_SNIFF_BYTES = 4096
+
+
+def _clean(text):
+    return " ".join(text.split())
+
+
+class _Collector:
+    """Parser target (lxml's target interface) accumulating everything in one pass."""
+
+    def __init__(self, base_url, skip_tags, max_text, max_links):
+        self.base_url = base_url
+        self.skip_tags = set(skip_tags) - ALWAYS_SKIPPED
+        self.max_text = max_text
+        self.max_links = max_links
+
+        self.title = None
+        self.first_h1 = None
+        self.meta_description = ""
+        self.headings = []
+        self.links = []
+        self.image_count = 0
+        self.text_parts = []
+        self.text_chars = 0
+        self.text_length = 0
+
+        self._hidden_depth = 0    # inside script/style/...
+        self._skip_depth = 0      # inside skip_tags (text dropped, headings/links kept)
+        self._title_parts = None
+        self._heading = None      # (tag, parts) while inside h1-h4
+        self._link = None         # (href, parts) while inside <a href>
+        self._pending = []        # text chunks since the last tag event
+
+    # --- lxml target interface ---
+
+    def start(self, tag, attrib):
+        self._flush()
+        if not isinstance(tag, str):
+            return
+        tag = tag.lower()
+
+        if tag in ALWAYS_SKIPPED:
+            self._hidden_depth += 1
+        elif tag in self.skip_tags:
+            self._skip_depth += 1
+        elif tag == "title" and self.title is None:
+            self._title_parts = []
+        elif tag == "meta":
+            if (attrib.get("name") or "").lower() == "description" and not self.meta_description:
+                self.meta_description = attrib.get("content") or ""
+        elif tag == "img":
+            self.image_count += 1
+        elif tag in HEADING_TAGS:
+            self._heading = (tag, [])
+        elif tag == "a" and attrib.get("href"):
+            self._link = (attrib["href"], [])
+
+    def end(self, tag):
+        self._flush()
+        if not isinstance(tag, str):
+            return
+        tag = tag.lower()
+
+        if tag in ALWAYS_SKIPPED:
+            self._hidden_depth = max(0, self._hidden_depth - 1)
+        elif tag in self.skip_tags:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title" and self._title_parts is not None:
+            self.title = _clean("".join(self._title_parts))
+            self._title_parts = None
+        elif self._heading is not None and tag == self._heading[0]:
+            text = _clean("".join(self._heading[1]))
+            self.headings.append({"level": tag, "text": text})
+            if tag == "h1" and self.first_h1 is None:
+                self.first_h1 = text
+            self._heading = None
+        elif tag == "a" and self._link is not None:
+            href, parts = self._link
+            if len(self.links) < self.max_links:
+                self.links.append({"text": _clean("".join(parts)),
+                                   "href": urljoin(self.base_url, href)})
+            self._link = None
+
+    def data(self, data):
+        # lxml reports entity and character references as separate chunks
+        self._pending.append(data)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        data = "".join(self._pending)
+        self._pending = []
+
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+            return
+        if self._hidden_depth:
+            return
+
+        if self._heading is not None:
+            self._heading[1].append(data)
+        if self._link is not None:
+            self._link[1].append(data)
+        if self._skip_depth:
+            return
+
+        text = _clean(data)
+        if not text:
+            return
+        self.text_length += len(text) + 1
+        if self.text_chars < self.max_text:
+            self.text_parts.append(text)
+            self.text_chars += len(text) + 1
+
+    def close(self):
+        self._flush()
+        return self
+
+
+class _StdlibParser(HTMLParser):
+    """Feeds html.parser events into a _Collector."""
+
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, {k: v or "" for k, v in attrs})
+
+    def handle_startendtag(self, tag, attrs):
+        # <svg/>, <a href=".."/>: opened and closed at once, as libxml2 does
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+def _charset(content, encoding=None):
+    """Header charset, else the page's <meta charset>, else UTF-8 (a known codec either way)."""
+    if not encoding:
+        match = _META_CHARSET_RE.search(content[:META_SNIFF_BYTES])
+        encoding = match.group(1).decode("ascii") if match else None
+    if not encoding:
+        return "utf-8"
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        return "utf-8"
+    return encoding
+
+
+def extract(content, base_url, skip_tags=(), max_text=MAX_TEXT_CHARS,
+            max_links=MAX_LINKS, encoding=None):
+    """
+    Parse an HTML document once and return everything the scrapers need.
+
+    Args:
+        content (bytes): Raw HTML (may be truncated)
+        base_url (str): Used to absolutize link hrefs
+        skip_tags (iterable): Extra tags whose text is dropped (e.g. CHROME_TAGS);
+            script/style/noscript/template/svg are always dropped
+        max_text (int): Characters of text to keep
+        max_links (int): Links to keep
+        encoding (str): Charset from the response headers, if known (else the
+            page's <meta charset>, else UTF-8)
+
+    Returns:
+        dict: title, first_h1, meta_description, headings [{level, text}]
+              (grouped h1..h4 in document order), links [{text, href}],
+              image_count, text (capped), text_length (uncapped)
+    """
+    collector = _Collector(base_url, skip_tags, max_text, max_links)
+    encoding = _charset(content, encoding)
+
+    if LXML_AVAILABLE:
+        parser = etree.HTMLParser(target=collector, encoding=encoding, recover=True,
+                                  remove_comments=True, remove_pis=True)
+        try:
+            parser.feed(content)
+            parser.close()
+        except etree.LxmlError:
+            pass  # keep whatever was collected before the parser gave up
+    else:
+        parser = _StdlibParser(collector)
+        parser.feed(content.decode(encoding, errors="replace"))
+        parser.close()
+
+    levels = {tag: i for i, tag in enumerate(HEADING_TAGS)}
+    headings = sorted(collector.headings, key=lambda h: levels[h["level"]])
+    text = " ".join(collector.text_parts)[:max_text]
+
+    return {
+        "title": collector.title or "",
+        "first_h1": collector.first_h1 or "",
+        "meta_description": collector.meta_description,
+        "headings": headings,
+        "links": collector.links,
+        "image_count": collector.image_count,
+        "text": text,
+        "text_length": max(collector.text_length - 1, 0),
+    }
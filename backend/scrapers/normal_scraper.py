@@ -1,44 +1,58 @@
 """
 Generic web scraper for non-specific platforms
 """
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from scrapers import dom_extract, html_extract
+from utils import browser_pool, http_client, scrape_cache
+from utils.scrolling import scroll_page
+
+def build_result(url, text, links):
+    """Shape text + [{text, href}] links into the generic scraper result"""
+    links = [link for link in links if link['href'].startswith('http')]
+
+    return {
+        'url': url,
+        'content': text[:5000],
+        'links': links[:100],
+        'project_links': []
+    }
+
+def parse_static(url, page, html):
+    """Static-tier parser (see scrapers.tiered): result from html_extract output"""
+    return build_result(url, page['text'], page['links'])
 
 def extract(url):
-    """Extract content from generic webpage using BeautifulSoup"""
+    """Extract content from generic webpage in a single parsing pass"""
     print(f"  🌐 Scraping generic website: {url}")
 
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        for script in soup(["script", "style", "meta", "link"]):
-            script.decompose()
-
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text_content = ' '.join(chunk for chunk in chunks if chunk)
-
-        links = []
-        for link in soup.find_all('a'):
-            href = link.get('href')
-            if href:
-                absolute_url = urljoin(url, href)
-                if absolute_url.startswith('http'):
-                    links.append({'text': link.get_text(strip=True), 'href': absolute_url})
-
-        return {
-            'url': url,
-            'content': text_content[:5000],
-            'links': links[:100],
-            'project_links': []
-        }
+    def parse(response):
+        page = html_extract.extract(response.content, url, max_text=5000,
+                                    encoding=response.encoding)
+        return build_result(url, page['text'], page['links'])
 
+    try:
+        return scrape_cache.cached_fetch("extract:generic", url, parse,
+                                         max_bytes=http_client.HTML_MAX_BYTES)
     except Exception as e:
         print(f"  ❌ Generic scraping error: {str(e)}")
         return {'url': url, 'content': '', 'links': [], 'project_links': []}
+
+def extract_rendered(url):
+    """Extract content from a JS-rendered webpage (Framer, Webflow apps, SPAs) in a browser"""
+    print(f"  🌐 Rendering generic website: {url}")
+
+    def scrape(page):
+        page.goto(url, wait_until="load", timeout=60000)
+        scroll_page(page, budget_ms=3000)
+
+        data = dom_extract.extract(page, fields=("text", "links"))
+        return build_result(url, ' '.join(data["text"].split()), data["links"])
+
+    try:
+        return scrape_cache.cached(
+            "extract:rendered", url,
+            lambda: browser_pool.run(scrape, block="text", return_headers=True),
+            is_valid=lambda data: bool(data.get('content')),
+        )
+    except Exception as e:
+        print(f"  ❌ Rendered scraping error: {str(e)}")
+        return {'url': url, 'content': '', 'links': [], 'project_links': []}
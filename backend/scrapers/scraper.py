@@ -1,54 +1,51 @@
 """
 Generic content scraper for project pages
 """
-import requests
-from bs4 import BeautifulSoup
+from scrapers import dom_extract, html_extract
+from utils import http_client, scrape_cache
 
 def scrape_project_page(url):
     """Scrape content from a project/case study page"""
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        title = ""
-        if soup.find('title'):
-            title = soup.find('title').get_text(strip=True)
-        elif soup.find('h1'):
-            title = soup.find('h1').get_text(strip=True)
-
-        meta_desc = ""
-        meta_tag = soup.find('meta', attrs={'name': 'description'})
-        if meta_tag and meta_tag.get('content'):
-            meta_desc = meta_tag['content']
-
-        headings = []
-        for tag in ['h1', 'h2', 'h3', 'h4']:
-            for heading in soup.find_all(tag):
-                headings.append({'level': tag, 'text': heading.get_text(strip=True)})
-
-        for element in soup(['script', 'style', 'nav', 'footer', 'header']):
-            element.decompose()
-
-        text_content = soup.get_text(separator=' ', strip=True)
-        images = soup.find_all('img')
-        image_count = len(images)
+    def parse(response):
+        page = html_extract.extract(response.content, url,
+                                    skip_tags=html_extract.CHROME_TAGS,
+                                    encoding=response.encoding)
 
         return {
             'url': url,
-            'title': title,
-            'meta_description': meta_desc,
-            'headings': headings,
-            'text_content': text_content,
-            'full_text_length': len(text_content),
-            'total_images': image_count
+            'title': page['title'] or page['first_h1'],
+            'meta_description': page['meta_description'],
+            'headings': page['headings'],
+            'text_content': page['text'],
+            'full_text_length': page['text_length'],
+            'total_images': page['image_count']
         }
 
+    try:
+        return scrape_cache.cached_fetch("project_page", url, parse,
+                                         max_bytes=http_client.HTML_MAX_BYTES)
     except Exception as e:
         print(f"    ⚠️  Scraping failed for {url}: {str(e)}")
         return {
             'url': url, 'title': 'Scraping Failed', 'meta_description': '',
             'headings': [], 'text_content': '', 'full_text_length': 0, 'total_images': 0
         }
+
+
+def extract_from_page(page, url):
+    """
+    Build the scrape_project_page result from an already-loaded Playwright page.
+
+    Uses the rendered DOM, so JS-rendered sites (Framer, Notion) yield real text.
+    """
+    data = dom_extract.extract(page, fields=("meta", "headings", "main_text", "images"))
+
+    return {
+        'url': url,
+        'title': data['title'],
+        'meta_description': data['meta_description'],
+        'headings': data['headings'],
+        'text_content': data['main_text'],
+        'full_text_length': len(data['main_text']),
+        'total_images': data['total_images']
+    }
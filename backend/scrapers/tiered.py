@@ -0,0 +1,182 @@
+"""
+Tiered portfolio fetching
+Tries a plain HTTP fetch first and only escalates to a pooled browser
+when the static HTML is not usable: an empty client-side mount node (JS
+app shell), a platform parser that finds nothing, or too little text
+(unless the parser found project links, e.g. in __NEXT_DATA__). The
+decision is remembered per domain, so later portfolios on the same host
+go straight to the tier that worked. A failed static fetch (timeout,
+connection error) escalates only that request.
+"""
+import os
+import re
+import time
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+from scrapers import behance, designfolio, notion, normal_scraper, html_extract
+from utils import http_client, scrape_cache
+
+TIERED_FETCH = os.environ.get("TIERED_FETCH", "1") != "0"
+TIER_MIN_TEXT_CHARS = int(os.environ.get("TIER_MIN_TEXT_CHARS", 500))
+TIER_DECISION_TTL = int(os.environ.get("TIER_DECISION_TTL", 6 * 60 * 60))  # seconds
+
+STATIC = "static"
+BROWSER = "browser"
+
+# Static-tier parsers: parse_static(url, page, html) -> result dict, or None
+# when the HTML lacks what the platform needs. Platforms without one
+# (Notion renders everything client-side) always use the browser.
+STATIC_PARSERS = {
+    "behance": behance.parse_static,
+    "designfolio": designfolio.parse_static,
+    "other": normal_scraper.parse_static,
+}
+
+BROWSER_EXTRACTORS = {
+    "behance": behance.extract,
+    "designfolio": designfolio.extract,
+    "notion": notion.extract,
+    "other": normal_scraper.extract_rendered,
+}
+
+# Empty mount nodes left by client-side rendered apps
+_SHELL_MARKERS = [
+    (re.compile(rb'<div[^>]+id=["\'](root|app|__next|___gatsby)["\'][^>]*>\s*</div>', re.I),
+     "spa-root"),
+    (re.compile(rb'<app-root[^>]*>\s*</app-root>', re.I), "angular"),
+    (re.compile(rb'<div[^>]+id=["\']__nuxt["\'][^>]*>\s*</div>', re.I), "nuxt"),
+]
+
+_decisions = {}  # domain key -> (tier, decided_at)
+_decisions_lock = threading.Lock()
+_counters = Counter()
+
+
+def _domain_key(url, platform):
+    """Known platforms share one decision; other sites are keyed by host."""
+    if platform != "other":
+        return platform
+    return (urlsplit(url).hostname or "").lower()
+
+
+def _remembered(key):
+    with _decisions_lock:
+        decision = _decisions.get(key)
+    if decision and time.time() - decision[1] < TIER_DECISION_TTL:
+        return decision[0]
+    return None
+
+
+def _remember(key, tier):
+    with _decisions_lock:
+        _decisions[key] = (tier, time.time())
+
+
+def _count(event):
+    with _decisions_lock:
+        _counters[event] += 1
+
+
+def detect_shell(html):
+    """Name of the JS-shell marker found in raw HTML, or None."""
+    for pattern, name in _SHELL_MARKERS:
+        if pattern.search(html):
+            return name
+    return None
+
+
+def assess(page, html, data, platform):
+    """
+    Decide whether static HTML is usable.
+
+    Args:
+        page (dict): html_extract.extract() output
+        html (bytes): Raw HTML
+        data (dict | None): The platform parser's result
+
+    Returns:
+        (bool, str): usable flag and the reason
+    """
+    shell = detect_shell(html)
+    if shell:
+        return False, f"JS app shell ({shell})"
+    if data is None:
+        return False, f"no {platform} data in static HTML"
+    if data.get("project_links"):
+        return True, f"{len(data['project_links'])} project links"
+    if page["text_length"] < TIER_MIN_TEXT_CHARS:
+        return False, f"only {page['text_length']} chars of text"
+    return True, f"{page['text_length']} chars of text"
+
+
+def _static_fetch(url, platform):
+    parser = STATIC_PARSERS[platform]
+
+    def parse(response):
+        page = html_extract.extract(response.content, url, encoding=response.encoding)
+        data = parser(url, page, response.content)
+        usable, reason = assess(page, response.content, data, platform)
+        return {"data": data if usable else None, "reason": reason}
+
+    return scrape_cache.cached_fetch(f"static:{platform}", url, parse,
+                                     max_bytes=http_client.HTML_MAX_BYTES)
+
+
+def fetch_portfolio(url, platform):
+    """
+    Scrape a portfolio with the cheapest tier that yields usable data.
+
+    Args:
+        url (str): Portfolio URL
+        platform (str): behance, designfolio, notion or other
+
+    Returns:
+        dict: url, content, links, project_links (platform scraper shape)
+    """
+    if not TIERED_FETCH:
+        # Previous behavior: plain HTTP for other sites, browser for platforms
+        if platform == "other":
+            return normal_scraper.extract(url)
+        return BROWSER_EXTRACTORS[platform](url)
+
+    if platform not in STATIC_PARSERS:
+        _count(BROWSER)
+        return BROWSER_EXTRACTORS[platform](url)
+
+    key = _domain_key(url, platform)
+    if _remembered(key) == BROWSER:
+        print(f"  ⚡ {key}: static HTML was not usable before, using the browser")
+        _count("remembered_browser")
+        return BROWSER_EXTRACTORS[platform](url)
+
+    try:
+        result = _static_fetch(url, platform)
+    except Exception as e:
+        # A network blip says nothing about the HTML, so nothing is remembered
+        print(f"  🔼 Escalating to browser: static fetch failed ({e})")
+        _count("static_failed")
+        return BROWSER_EXTRACTORS[platform](url)
+
+    if result["data"]:
+        print(f"  ⚡ Static HTML is usable ({result['reason']}), skipping the browser")
+        _remember(key, STATIC)
+        _count(STATIC)
+        if platform == "designfolio":
+            # Also on a scrape-cache hit, where parse_static did not run
+            return designfolio.restore_build_id(url, result["data"])
+        return result["data"]
+
+    print(f"  🔼 Escalating to browser: {result['reason']}")
+    _remember(key, BROWSER)
+    _count("escalated")
+    return BROWSER_EXTRACTORS[platform](url)
+
+
+def stats():
+    """How often each tier served a portfolio, plus remembered decisions."""
+    with _decisions_lock:
+        decisions = {key: tier for key, (tier, _) in _decisions.items()}
+        counters = dict(_counters)
+    return {"enabled": TIERED_FETCH, "counters": counters, "decisions": decisions}
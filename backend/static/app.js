@@ -7,17 +7,17 @@ let appState = {
     currentView: 'landing'
 };
 
-// Loading steps (same as original)
+// Loading steps, each completed by a stage event from /jobs/<id>/events
 const loadingSteps = [
-    "Connecting to portfolio...",
-    "Scanning case studies...",
-    "Extracting project links...",
-    "Analyzing portfolio...",
-    "Generating insights...",
-    "Compiling reports...",
-    "Finalizing results..."
+    { label: "Waiting for an analysis slot...", doneOn: "started" },
+    { label: "Connecting to portfolio...", doneOn: "portfolio_scraped" },
+    { label: "Analyzing portfolio...", doneOn: "gemini_main_done" },
+    { label: "Extracting project links...", doneOn: "projects_found" }
 ];
 
+// How often to poll /jobs/<id> when EventSource is unavailable (ms)
+const JOB_POLL_INTERVAL = 2000;
+
 // Init
 document.addEventListener("DOMContentLoaded", () => {
     initializeLoadingSteps();
@@ -35,7 +35,7 @@ function initializeLoadingSteps() {
                     <circle cx="10" cy="10" r="8"/>
                 </svg>
             </div>
-            <span>${step}</span>
+            <span>${step.label}</span>
         </div>
     `).join('');
 }
@@ -63,7 +63,7 @@ async function handleFormSubmit(e) {
     formData.append("resume", document.getElementById("resume").files[0]);
 
     showView("loading");
-    await animateLoadingSteps();
+    document.querySelector('.loading-step').classList.add('active');
 
     let res = await fetch("/analyze", {
         method: "POST",
@@ -78,8 +78,60 @@ async function handleFormSubmit(e) {
         return;
     }
 
-    // Redirect to results page
-    window.location.href = "/results";
+    // Analysis runs in the background: follow its progress events
+    const job = window.EventSource
+        ? await followJobEvents(result.job_id)
+        : await waitForJob(result.job_id);
+
+    if (job.status === "failed") {
+        alert("Error: " + (job.error || "Analysis failed"));
+        showView("landing");
+        return;
+    }
+
+    // Redirect to this job's results (case studies keep streaming in there)
+    window.location.href = `/results?job=${result.job_id}`;
+}
+
+// Resolves once the portfolio report is ready (or the job ends)
+function followJobEvents(jobId) {
+    return new Promise(resolve => {
+        const source = new EventSource(`/jobs/${jobId}/events`);
+        const finish = job => {
+            source.close();
+            resolve(job);
+        };
+
+        source.addEventListener("stage", e => {
+            const { stage } = JSON.parse(e.data);
+            markStepsDone(stage);
+            if (stage === "projects_found") finish({ status: "running" });
+        });
+
+        source.addEventListener("done", e => finish(JSON.parse(e.data)));
+
+        // Stream unavailable: fall back to polling
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) {
+                waitForJob(jobId).then(resolve);
+            }
+        };
+    });
+}
+
+async function waitForJob(jobId) {
+    while (true) {
+        const res = await fetch(`/jobs/${jobId}`);
+        const job = await res.json();
+
+        if (!res.ok) {
+            return { status: "failed", error: job.error };
+        }
+        if (job.status === "completed" || job.status === "failed") {
+            return job;
+        }
+        await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL));
+    }
 }
 
 function showView(view) {
@@ -87,12 +139,12 @@ function showView(view) {
     document.getElementById("loadingScreen").classList.toggle("active", view === "loading");
 }
 
-async function animateLoadingSteps() {
-    const steps = document.querySelectorAll('.loading-step');
-    for (let i = 0; i < steps.length; i++) {
-        steps[i].classList.add('active');
-        await new Promise(resolve => setTimeout(resolve, 700));
-        steps[i].classList.remove('active');
-        steps[i].classList.add('completed');
-    }
+function markStepsDone(stage) {
+    const doneIndex = loadingSteps.findIndex(step => step.doneOn === stage);
+    if (doneIndex === -1) return;
+
+    document.querySelectorAll('.loading-step').forEach((el, i) => {
+        el.classList.toggle('completed', i <= doneIndex);
+        el.classList.toggle('active', i === doneIndex + 1);
+    });
 }
@@ -0,0 +1,175 @@
+"""
+Process-wide pool of warm Playwright browsers
+Playwright's sync API is bound to the thread that started it, so every
+pool slot is a dedicated thread owning one Chromium. Callers hand over a
+task; it runs on a free slot with a fresh page in its own browser context
+(cookies/storage isolated per task). Browsers are recycled after
+BROWSER_RECYCLE_AFTER pages or as soon as they crash.
+"""
+import os
+import queue
+import atexit
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from playwright.sync_api import sync_playwright
+
+from utils import request_blocking
+
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", 2))
+BROWSER_RECYCLE_AFTER = int(os.environ.get("BROWSER_RECYCLE_AFTER", 50))
+BROWSER_TASK_TIMEOUT = int(os.environ.get("BROWSER_TASK_TIMEOUT", 300))  # seconds
+
+_tasks = queue.Queue()
+_slots = []
+_lock = threading.Lock()
+
+
+class _BrowserSlot(threading.Thread):
+    """One pool slot: a thread that owns a Playwright driver and one browser."""
+
+    def __init__(self, index):
+        super().__init__(name=f"browser-slot-{index}", daemon=True)
+        self.playwright = None
+        self.browser = None
+        self.pages_served = 0
+
+    def _ensure_browser(self):
+        """Return a live browser, relaunching if it crashed or is due for recycling."""
+        if self.browser is not None:
+            if not self.browser.is_connected():
+                print(f"  ♻️  {self.name}: browser crashed, relaunching")
+                self._close_browser()
+            elif self.pages_served >= BROWSER_RECYCLE_AFTER:
+                print(f"  ♻️  {self.name}: recycling browser after {self.pages_served} pages")
+                self._close_browser()
+
+        if self.browser is None:
+            if self.playwright is None:
+                self.playwright = sync_playwright().start()
+            self.browser = self.playwright.chromium.launch(headless=True)
+            self.pages_served = 0
+
+        return self.browser
+
+    def _close_browser(self):
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+
+    def _run_task(self, task, block, platform, context_options):
+        browser = self._ensure_browser()
+        context = None
+        block_stats = None
+        try:
+            context = browser.new_context(**context_options)
+            block_stats = request_blocking.install(context, block, platform)
+            page = context.new_page()
+
+            # Headers of the first final (non-redirect) main-document response
+            document_headers = {}
+
+            def on_response(response):
+                if (not document_headers
+                        and response.request.is_navigation_request()
+                        and response.frame == page.main_frame
+                        and not 300 <= response.status < 400):
+                    document_headers.update(response.headers)
+
+            page.on("response", on_response)
+            return task(page), document_headers
+        finally:
+            self.pages_served += 1
+            if block_stats is not None:
+                block_stats.report()
+            if context is not None:
+                try:
+                    context.close()
+                except Exception:
+                    pass
+            if not browser.is_connected():
+                self._close_browser()
+
+    def run(self):
+        while True:
+            item = _tasks.get()
+            if item is None:
+                break
+
+            task, block, platform, context_options, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(self._run_task(task, block, platform, context_options))
+            except BaseException as e:
+                future.set_exception(e)
+
+        self._close_browser()
+        if self.playwright is not None:
+            try:
+                self.playwright.stop()
+            except Exception:
+                pass
+
+
+def _start_pool():
+    with _lock:
+        if _slots:
+            return
+        for index in range(BROWSER_POOL_SIZE):
+            slot = _BrowserSlot(index)
+            slot.start()
+            _slots.append(slot)
+
+
+def run(task, timeout=BROWSER_TASK_TIMEOUT, block=None, platform=None,
+        return_headers=False, **context_options):
+    """
+    Run task(page) on a pooled browser and return its result.
+
+    Args:
+        task (callable): Receives a fresh Playwright page; page.context is
+            private to this call and closed afterwards
+        timeout (int): Seconds to wait for a free slot plus the task itself
+        block (str): request_blocking profile ("text", "screenshot") or None
+        platform (str): Platform name for profile overrides (e.g. "behance")
+        return_headers (bool): Also return the main document's response
+            headers (for cache validators), as (result, headers)
+        **context_options: Passed to browser.new_context()
+            (e.g. viewport, storage_state)
+
+    Raises:
+        Whatever the task raised, or concurrent.futures.TimeoutError
+    """
+    if isinstance(threading.current_thread(), _BrowserSlot):
+        raise RuntimeError("browser_pool.run() cannot be nested inside a pool task")
+
+    _start_pool()
+    future = Future()
+    _tasks.put((task, block, platform, context_options, future))
+
+    try:
+        result, document_headers = future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()  # skipped if still queued; a running task finishes on its own
+        raise
+
+    if return_headers:
+        return result, document_headers
+    return result
+
+
+@atexit.register
+def shutdown():
+    """Close all pooled browsers (called automatically at interpreter exit)."""
+    with _lock:
+        slots = list(_slots)
+        _slots.clear()
+    for _ in slots:
+        _tasks.put(None)
+    for slot in slots:
+        slot.join(timeout=5)
@@ -0,0 +1,248 @@
+"""
+Prompt input compaction
+Shrinks scraped page text before it goes into a Gemini prompt: repeated
+sentences (menus, footers shown twice) and boilerplate (cookie banners,
+copyright lines, "skip to content") are dropped, and if the text is
+still over the token budget the most salient segments are kept, ranked
+by YAKE keywords (word frequency when yake is not installed), in their
+original order.
+"""
+import os
+import re
+import math
+import threading
+from collections import Counter
+
+try:
+    import yake
+    YAKE_AVAILABLE = True
+except ImportError:
+    YAKE_AVAILABLE = False
+
+from utils.gemini_client import CHARS_PER_TOKEN, estimate_tokens
+
+CASE_STUDY_TOKEN_BUDGET = int(os.environ.get("CASE_STUDY_TOKEN_BUDGET", 1500))
+PORTFOLIO_TOKEN_BUDGET = int(os.environ.get("PORTFOLIO_TOKEN_BUDGET", 1000))
+MAX_HEADINGS = 15
+MAX_LINKS = 50
+SEGMENT_CHARS = 320        # sentences are grouped into (or split to) segments of at most this size
+KEYWORDS = 20
+GAP_MARKER = " … "
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+|\s+(?=[•·|])|\s*\n\s*')
+_NORMALIZE_RE = re.compile(r'[^a-z0-9]+')
+_WORD_RE = re.compile(r"[a-zA-Z][a-zA-Z'-]{3,}")
+_BOILERPLATE_RE = re.compile(
+    r"we use cookies|cookie (policy|settings|preferences|consent)|accept (all )?cookies"
+    r"|privacy policy|terms (of (use|service)|(&|and) conditions)|all rights reserved|©"
+    r"|skip to (main )?content|back to top|(subscribe|sign up) (to|for) (our |the )?newsletter"
+    r"|made (with|in|on) (framer|webflow|notion|wix|squarespace)|powered by ",
+    re.I,
+)
+_STOPWORDS = {
+    "this", "that", "with", "from", "have", "were", "they", "their", "there", "which",
+    "would", "could", "about", "into", "what", "when", "where", "your", "more", "also",
+    "been", "than", "then", "them", "these", "those", "will", "each", "other", "some",
+}
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def _sentences(text):
+    return [s.strip() for s in _SENTENCE_RE.split(text) if s and s.strip()]
+
+
+def _clean_sentences(text):
+    """Sentences without exact repeats or boilerplate, in order."""
+    seen = set()
+    kept = []
+    for sentence in _sentences(text):
+        key = _NORMALIZE_RE.sub("", sentence.lower())
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        if _BOILERPLATE_RE.search(sentence) and len(sentence) < 300:
+            continue
+        kept.append(sentence)
+    return kept
+
+
+def _split_long(sentence):
+    """Chunks of at most SEGMENT_CHARS, cut at a space where there is one."""
+    chunks = []
+    while len(sentence) > SEGMENT_CHARS:
+        cut = sentence.rfind(" ", 0, SEGMENT_CHARS + 1)
+        if cut <= 0:
+            cut = SEGMENT_CHARS
+        chunks.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        chunks.append(sentence)
+    return chunks
+
+
+def _prefix(text, token_budget):
+    """Start of text within token_budget, cut at a space where there is one."""
+    limit = token_budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit + 1)
+    return text[:cut if cut > 0 else limit].rstrip() + GAP_MARKER.rstrip()
+
+
+def _segments(sentences):
+    """Sentences grouped into segments; over-long ones are split first."""
+    segments, current = [], ""
+    for sentence in (chunk for s in sentences for chunk in _split_long(s)):
+        if current and len(current) + len(sentence) > SEGMENT_CHARS:
+            segments.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _keywords(text):
+    """[(keyword, weight)] with weight 1.0 for the most salient, descending."""
+    if YAKE_AVAILABLE:
+        extractor = yake.KeywordExtractor(lan="en", n=2, top=KEYWORDS)
+        ranked = [kw for kw, _ in extractor.extract_keywords(text)]
+    else:
+        words = Counter(
+            w.lower() for w in _WORD_RE.findall(text) if w.lower() not in _STOPWORDS
+        )
+        ranked = [w for w, _ in words.most_common(KEYWORDS)]
+    return [(kw.lower(), 1.0 - i / len(ranked)) for i, kw in enumerate(ranked)]
+
+
+def _rank(segments, text):
+    keywords = _keywords(text)
+    scores = []
+    for i, segment in enumerate(segments):
+        lower = segment.lower()
+        hits = sum(weight for kw, weight in keywords if kw in lower)
+        density = hits / math.sqrt(max(1, estimate_tokens(segment)))
+        position = 0.3 * (1 - i / len(segments))  # intros tend to carry the problem statement
+        scores.append(density + position)
+    return scores
+
+
+def compact_text(text, token_budget):
+    """
+    Deduplicate, strip boilerplate and fit text into token_budget.
+
+    Args:
+        text (str): Page text
+        token_budget (int): Max estimated tokens (0 = no limit)
+
+    Returns:
+        str: compacted text; omitted stretches are marked with "…". Never
+        less than a truncated prefix of the cleaned text.
+    """
+    sentences = _clean_sentences(text or "")
+    cleaned = " ".join(sentences)
+    if not token_budget or estimate_tokens(cleaned) <= token_budget:
+        return cleaned
+
+    segments = _segments(sentences)
+    scores = _rank(segments, cleaned)
+
+    chosen, used = set(), 0
+    for i in sorted(range(len(segments)), key=lambda i: scores[i], reverse=True):
+        cost = estimate_tokens(segments[i])
+        if used + cost > token_budget:
+            continue
+        chosen.add(i)
+        used += cost
+    if not chosen:
+        return _prefix(cleaned, token_budget)
+
+    parts = []
+    for i, segment in enumerate(segments):
+        if i in chosen:
+            parts.append(segment)
+        elif parts and parts[-1] != GAP_MARKER.strip():
+            parts.append(GAP_MARKER.strip())
+    return " ".join(parts)
+
+
+def compact_headings(headings, limit=MAX_HEADINGS):
+    """Non-empty, de-duplicated headings, at most limit."""
+    seen = set()
+    kept = []
+    for heading in headings or []:
+        text = " ".join((heading.get("text") or "").split())
+        key = _NORMALIZE_RE.sub("", text.lower())
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        kept.append({"level": heading.get("level", ""), "text": text})
+        if len(kept) >= limit:
+            break
+    return kept
+
+
+def compact_links(links, limit=MAX_LINKS):
+    """Links de-duplicated by href (first anchor text wins), at most limit."""
+    seen = set()
+    kept = []
+    for link in links or []:
+        href = (link.get("href") or "").split("#")[0].rstrip("/")
+        if not href or href in seen:
+            continue
+        seen.add(href)
+        kept.append({"text": " ".join((link.get("text") or "").split()), "href": link["href"]})
+        if len(kept) >= limit:
+            break
+    return kept
+
+
+def _record(label, before, after):
+    with _counters_lock:
+        _counters["calls"] += 1
+        _counters["tokens_before"] += before
+        _counters["tokens_after"] += after
+    saved = 100 * (before - after) / before if before else 0
+    print(f"  🗜️  Compacted {label} input: {before} → {after} tokens ({saved:.0f}% smaller)")
+
+
+def compact_case_study(scraped_data, token_budget=CASE_STUDY_TOKEN_BUDGET):
+    """Copy of scraped project data with compacted text_content and headings."""
+    raw_text = scraped_data.get("text_content", "")
+    raw_headings = scraped_data.get("headings", [])
+
+    compacted = dict(scraped_data)
+    compacted["text_content"] = compact_text(raw_text, token_budget)
+    compacted["headings"] = compact_headings(raw_headings)
+
+    before = estimate_tokens(raw_text) + estimate_tokens(str(raw_headings))
+    after = estimate_tokens(compacted["text_content"]) + estimate_tokens(str(compacted["headings"]))
+    _record("case study", before, after)
+    return compacted
+
+
+def compact_portfolio(scraped_data, token_budget=PORTFOLIO_TOKEN_BUDGET):
+    """Copy of scraped portfolio data with compacted content and links."""
+    raw_content = scraped_data.get("content", "")
+    raw_links = scraped_data.get("links", [])
+
+    compacted = dict(scraped_data)
+    compacted["content"] = compact_text(raw_content, token_budget)
+    compacted["links"] = compact_links(raw_links)
+
+    before = estimate_tokens(raw_content) + estimate_tokens(str(raw_links))
+    after = estimate_tokens(compacted["content"]) + estimate_tokens(str(compacted["links"]))
+    _record("portfolio", before, after)
+    return compacted
+
+
+def stats():
+    """Estimated prompt-input tokens before and after compaction since startup."""
+    with _counters_lock:
+        counters = dict(_counters)
+    before = counters.get("tokens_before", 0)
+    counters["saved_ratio"] = round(1 - counters.get("tokens_after", 0) / before, 3) if before else None
+    return counters
@@ -0,0 +1,124 @@
+"""
+Per-job progress events for Server-Sent Events streaming
+The pipeline publishes stage updates, partial case-study scores while
+Gemini is still streaming, and finished reports; every
+subscriber replays the job's log from the start (or from Last-Event-ID)
+and then follows new events until the job is done.
+"""
+import os
+import json
+import threading
+import time
+
+from utils.report_store import report_view
+
+EVENT_RETENTION_SECONDS = int(os.environ.get("EVENT_RETENTION_SECONDS", 60 * 60))
+SSE_KEEPALIVE_SECONDS = 15
+
+_streams = {}
+_lock = threading.Lock()
+
+
+class _JobStream:
+    def __init__(self):
+        self.events = []
+        self.closed = False
+        self.closed_at = None
+        self.cond = threading.Condition()
+
+
+def _prune():
+    """Drop closed streams older than EVENT_RETENTION_SECONDS (caller holds the lock)."""
+    cutoff = time.time() - EVENT_RETENTION_SECONDS
+    for job_id in [j for j, s in _streams.items() if s.closed and s.closed_at < cutoff]:
+        del _streams[job_id]
+
+
+def _get_stream(job_id, create=False):
+    with _lock:
+        stream = _streams.get(job_id)
+        if stream is None and create:
+            _prune()
+            stream = _streams[job_id] = _JobStream()
+        return stream
+
+
+def publish(job_id, event, data=None):
+    """Append an event to a job's log and wake up subscribers."""
+    if not job_id:
+        return
+    stream = _get_stream(job_id, create=True)
+    with stream.cond:
+        if stream.closed:
+            return
+        stream.events.append((len(stream.events) + 1, event, data or {}))
+        stream.cond.notify_all()
+
+
+def stage(job_id, name, message, **extra):
+    """Publish a pipeline stage update (e.g. "portfolio_scraped")."""
+    publish(job_id, "stage", {"stage": name, "message": message, **extra})
+
+
+def report(job_id, raw_report, position, message, **extra):
+    """Publish a freshly saved report in the same shape /reports returns."""
+    view = report_view(raw_report)
+    if view:
+        publish(job_id, "report", {
+            "report": view, "position": position, "message": message, **extra
+        })
+
+
+def partial(job_id, position, url, title, phase, phases_done):
+    """Publish one scored phase of a case study that is still streaming."""
+    publish(job_id, "partial", {
+        "position": position, "url": url, "title": title,
+        "phase": phase, "phases_done": phases_done
+    })
+
+
+def close(job_id, status, error=None):
+    """Publish the terminal "done" event and end all streams for the job."""
+    publish(job_id, "done", {"status": status, "error": error})
+    stream = _get_stream(job_id)
+    if stream:
+        with stream.cond:
+            stream.closed = True
+            stream.closed_at = time.time()
+            stream.cond.notify_all()
+
+
+def exists(job_id):
+    return _get_stream(job_id) is not None
+
+
+def sse_stream(job_id, last_event_id=0):
+    """
+    Generator of SSE-formatted strings for one job.
+
+    Replays events after last_event_id, then blocks for new ones,
+    sending a comment line every SSE_KEEPALIVE_SECONDS to keep
+    proxies from closing the connection. Ends once the job is done.
+    """
+    stream = _get_stream(job_id)
+    if stream is None:
+        return
+    sent = last_event_id
+
+    while True:
+        with stream.cond:
+            if len(stream.events) <= sent and not stream.closed:
+                stream.cond.wait(timeout=SSE_KEEPALIVE_SECONDS)
+            pending = stream.events[sent:]
+            finished = stream.closed
+
+        if not pending and not finished:
+            yield ": keepalive\n\n"
+            continue
+
+        for event_id, event, data in pending:
+            yield f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            sent = event_id
+
+        if finished and sent >= len(stream.events):
+            return
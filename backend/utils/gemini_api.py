@@ -1,89 +1,212 @@
 """
 Gemini API integration for content analysis
-Mock implementation with option for real API
+Calls go through the shared client (utils.gemini_client), which runs
+on Gemini or, without GEMINI_API_KEY, on the offline stand-in
+(utils.local_llm); answers are cached on disk (utils.llm_cache).
+Responses are requested against a declared schema (utils.schemas) where
+supported, repaired locally when malformed (utils.json_repair), and only
+fields that are still invalid are asked for again.
 """
 import os
-import json
-import re
-# GEMINI_API_KEY= None
+import threading
+from collections import Counter
+
+from utils import llm_cache, gemini_client, local_llm, schemas, json_repair
+from utils.gemini_client import GeminiError, StreamAborted
+from utils.json_stream import ArrayElementStream, MalformedStream
+
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
-USE_REAL_API = bool(GEMINI_API_KEY)
+GEMINI_STREAMING = os.environ.get('GEMINI_STREAMING', '1') != '0'
+# Send response_schema / JSON mime type with schema'd calls (0 for models without structured output)
+STRUCTURED_OUTPUT = os.environ.get('STRUCTURED_OUTPUT', '1') != '0'
+
+PARSE_ERROR = 'Could not parse JSON'
+
+REASK_PROMPT = """
+
+---------------------------
+CORRECTION
+---------------------------
+Your previous answer was usable except for these fields:
+{problems}
 
-if USE_REAL_API:
+Return ONLY valid JSON containing just these top-level keys, with complete
+corrected values: {fields}
+"""
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+if gemini_client.LLM_BACKEND == "gemini":
     try:
         import google.generativeai as genai
         genai.configure(api_key=GEMINI_API_KEY)
         print("✅ Gemini API configured")
     except ImportError:
-        print("⚠️  google-generativeai not installed, using mock mode")
-        USE_REAL_API = False
-
-def analyze_content(prompt, data):
-    """Analyze content using Gemini API (or mock)"""
-    if USE_REAL_API:
-        return analyze_with_real_api(prompt, data)
-    else:
-        return analyze_with_mock(prompt, data)
-
-def analyze_with_real_api(prompt, data):
-    """Use actual Gemini API for analysis"""
+        print("⚠️  google-generativeai not installed, using the local LLM stand-in")
+        gemini_client.set_backend("local")
+else:
+    print(f"🔧 Using the local LLM stand-in (profile: {local_llm.LOCAL_LLM_PROFILE}); "
+          f"set GEMINI_API_KEY for real analysis")
+
+def _count(event, n=1):
+    with _counters_lock:
+        _counters[event] += n
+
+def analyze_content(prompt, data, prefix=None, tag=None, schema=None, reask=True):
+    """
+    Analyze content with the configured LLM backend
+
+    prefix is static leading instructions (e.g. a scoring rubric) that
+    the client can cache server-side; tag labels the call in stats.
+    schema (utils.schemas) is requested as structured output and checked
+    on the answer; with reask, invalid fields are asked for again.
+    """
+    return analyze_with_llm(prompt, data, prefix=prefix, tag=tag, schema=schema, reask=reask)
+
+def analyze_content_streaming(prompt, data, array_key, on_element, prefix=None, tag=None,
+                              schema=None, reask=True):
+    """
+    Like analyze_content, but streams the response and calls
+    on_element(element, count) as each element of the top-level array
+    under array_key (e.g. "phase_scores") is complete.
+
+    A stream that goes malformed is aborted at once and the call is
+    repeated without streaming (repaired and validated as usual).
+    """
+    if not GEMINI_STREAMING:
+        return analyze_content(prompt, data, prefix=prefix, tag=tag, schema=schema, reask=reask)
+
+    parser = ArrayElementStream(array_key)
+
+    def on_text(chunk):
+        try:
+            elements = parser.feed(chunk)
+        except MalformedStream as e:
+            raise StreamAborted(str(e)) from e
+        for element in elements:
+            on_element(element, len(parser.elements))
+
     try:
-        model = genai.GenerativeModel('models/gemini-2.0-flash-exp')
-        full_prompt = f"{prompt}\n\nData: {json.dumps(data, indent=2)[:10000]}"
-        response = model.generate_content(full_prompt)
-        response_text = response.text.strip()
-        return parse_json_response(response_text)
-    except Exception as e:
-        print(f"  ⚠️  Gemini API error: {e}")
-        return analyze_with_mock(prompt, data)
+        return analyze_with_llm(prompt, data, on_text=on_text, prefix=prefix, tag=tag,
+                                schema=schema, reask=reask)
+    except StreamAborted as e:
+        print(f"  ⚠️  Aborted malformed Gemini stream ({e}), retrying without streaming")
+        return analyze_with_llm(prompt, data, prefix=prefix, tag=tag,
+                                schema=schema, reask=reask)
 
-def parse_json_response(text):
-    """Extract JSON from Gemini response that might contain markdown"""
-    text = re.sub(r'```json\s*', '', text)
-    text = re.sub(r'```\s*', '', text)
+def _generation_options(schema):
+    if schema is None or not STRUCTURED_OUTPUT:
+        return {}
+    return {"generation_config": {
+        "response_mime_type": "application/json",
+        "response_schema": schema,
+    }}
+
+def analyze_with_llm(prompt, data, on_text=None, prefix=None, tag=None,
+                     schema=None, reask=True):
+    """
+    Run one analysis call (served from the LLM cache when unchanged)
+
+    Rate limits and transient errors are retried by the shared client;
+    a call that still fails raises GeminiError.
+    Only complete, schema-valid results are cached.
+    """
+    model = gemini_client.model_id()
+    cache_key = llm_cache.make_key(model, f"{prefix or ''}{prompt}", data)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        print("  💾 Gemini response served from cache")
+        return cached
 
+    # Prompts already embed the (compacted) page data, so it is not appended
+    # again; data only keys the cache
     try:
-        return json.loads(text)
-    except:
-        pass
+        response_text = gemini_client.generate(
+            prompt, on_text=on_text, prefix=prefix, tag=tag, **_generation_options(schema)
+        ).text.strip()
+    except GeminiError as e:
+        print(f"  ❌ Gemini API error: {e}")
+        raise
 
-    match = re.search(r'\{.*\}', text, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group())
-        except:
-            pass
-
-    return {'error': 'Could not parse JSON', 'raw_response': text[:500]}
-
-def analyze_with_mock(prompt, data):
-    """Generate mock analysis when API is not available"""
-    print("  🔧 Using mock analysis (set GEMINI_API_KEY for real analysis)")
-
-    if 'project_name' in prompt or 'case study' in prompt.lower():
-        return {
-            'project_name': data.get('scraped_data', {}).get('title', 'Mock Project'),
-            'score': 75,
-            'strengths': [
-                'Clear project structure',
-                'Good visual presentation',
-                'Problem statement defined'
-            ],
-            'weaknesses': [
-                'Could show more user research',
-                'Missing validation metrics',
-                'Limited iteration examples'
-            ],
-            'summary': 'This is a mock analysis. The project demonstrates solid UX practices with room for improvement in research documentation.',
-            'has_user_research': True,
-            'has_iterations': True,
-            'has_visuals': True,
-            'recommendation': 'Add more detailed user research methodology and testing results.'
-        }
-    else:
-        return {
-            'portfolio_summary': 'This is a mock analysis. Portfolio shows professional work across multiple projects.',
-            'project_links': [],
-            'skills_detected': ['UI/UX Design', 'Prototyping', 'User Research', 'Visual Design'],
-            'overall_quality': 'Good'
-        }
+    result = parse_json_response(response_text)
+    if is_parse_error(result):
+        return result
+
+    valid = True
+    if schema is not None:
+        result = schemas.coerce(result, schema)
+        errors = schemas.validate(result, schema)
+        if errors and reask:
+            result, errors = reask_invalid_fields(result, errors, prompt, prefix, tag, schema)
+        valid = not errors
+        if errors:
+            _count("invalid_results")
+            print(f"  ⚠️  Gemini answer still has {len(errors)} invalid field(s): "
+                  f"{', '.join(path for path, _ in errors[:5])}")
+
+    if valid:
+        llm_cache.put(cache_key, model, result)
+    return result
+
+def reask_invalid_fields(result, errors, prompt, prefix, tag, schema):
+    """
+    Ask again for just the top-level fields that failed validation and
+    merge them into result. Returns (result, remaining errors).
+    """
+    fields = schemas.top_level_fields(errors)
+    if not fields:
+        return result, errors
+
+    print(f"  🩹 Re-asking Gemini for invalid fields: {', '.join(fields)}")
+    _count("reasks")
+    problems = "\n".join(f"- {path or '(root)'}: {problem}" for path, problem in errors[:20])
+    try:
+        response_text = gemini_client.generate(
+            prompt + REASK_PROMPT.format(problems=problems, fields=", ".join(fields)),
+            prefix=prefix, tag=tag,
+            **_generation_options(schemas.subset(schema, fields)),
+        ).text
+    except GeminiError as e:
+        print(f"  ❌ Gemini re-ask failed: {e}")
+        return result, errors
+
+    patch = parse_json_response(response_text)
+    if not is_parse_error(patch):
+        for field in fields:
+            if field in patch:
+                result[field] = schemas.coerce(patch[field], schema["properties"][field])
+    return result, schemas.validate(result, schema)
+
+def is_parse_error(result):
+    """True for the placeholder parse_json_response returns on unparseable output"""
+    return not isinstance(result, dict) or result.get('error') == PARSE_ERROR
+
+def parse_json_response(text):
+    """
+    Parse the JSON object in a Gemini response, repairing fences, commas,
+    quotes and truncation. Always returns a dict (the PARSE_ERROR
+    placeholder when no object could be read).
+    """
+    try:
+        result, repaired = json_repair.repair(text)
+    except json_repair.RepairFailed as e:
+        _count("parse_failures")
+        print(f"  ⚠️  Could not parse Gemini JSON: {e}")
+        return {'error': PARSE_ERROR, 'raw_response': text[:500]}
+
+    if not isinstance(result, dict):
+        # Every prompt asks for an object; callers index the result as one
+        _count("parse_failures")
+        print(f"  ⚠️  Gemini returned JSON {type(result).__name__}, expected an object")
+        return {'error': PARSE_ERROR, 'raw_response': text[:500]}
+
+    if repaired:
+        _count("repaired")
+        print("  🩹 Repaired malformed Gemini JSON locally")
+    return result
+
+def stats():
+    """Output repair, re-ask and parse-failure counts since startup."""
+    with _counters_lock:
+        return dict(_counters)
@@ -0,0 +1,396 @@
+"""
+Shared Gemini client
+One GenerativeModel per model name, reused across calls; a process-wide
+concurrency limit; token buckets for requests and tokens per minute so
+throughput stays under quota; jittered exponential backoff on 429/5xx
+that honors the server's retry hint; per-call latency and token
+accounting; optional streaming, where each text chunk is handed to
+a callback as it arrives; and prompt prefixes (e.g. a long scoring
+rubric) registered once as server-side cached context, keyed by a hash
+of the prefix, falling back to a system instruction where context
+caching is not available.
+
+The model behind the client is pluggable (LLM_BACKEND): "gemini" is
+google.generativeai; "local" is utils.local_llm, an offline stand-in
+with the same generate_content() interface. Without GEMINI_API_KEY
+the local backend is used.
+"""
+import os
+import re
+import time
+import random
+import hashlib
+import threading
+from datetime import timedelta
+from collections import Counter, defaultdict, deque
+
+from utils import local_llm
+
+try:
+    from google.api_core import exceptions as google_exceptions
+    GOOGLE_RETRYABLE_ERRORS = (
+        google_exceptions.ResourceExhausted,     # 429
+        google_exceptions.TooManyRequests,
+        google_exceptions.InternalServerError,   # 500
+        google_exceptions.ServiceUnavailable,    # 503
+        google_exceptions.DeadlineExceeded,      # 504
+    )
+except ImportError:
+    GOOGLE_RETRYABLE_ERRORS = ()
+
+RETRYABLE_ERRORS = GOOGLE_RETRYABLE_ERRORS + (
+    local_llm.RateLimited, local_llm.ServerError, local_llm.Timeout,
+)
+
+# "gemini" | "local"
+LLM_BACKEND = os.environ.get("LLM_BACKEND") or (
+    "gemini" if os.environ.get("GEMINI_API_KEY") else "local"
+)
+
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "models/gemini-2.0-flash-exp")
+GEMINI_CONCURRENCY = int(os.environ.get("GEMINI_CONCURRENCY", 4))
+GEMINI_RPM = int(os.environ.get("GEMINI_RPM", 60))           # requests per minute
+GEMINI_TPM = int(os.environ.get("GEMINI_TPM", 1_000_000))    # tokens per minute
+GEMINI_RETRIES = int(os.environ.get("GEMINI_RETRIES", 5))
+GEMINI_TIMEOUT = float(os.environ.get("GEMINI_TIMEOUT", 120))  # seconds per request
+GEMINI_BACKOFF_BASE = 1.0   # seconds
+GEMINI_BACKOFF_MAX = 60.0   # seconds
+CHARS_PER_TOKEN = 4         # estimate used to reserve TPM before a call
+GEMINI_CONTEXT_CACHE_TTL = int(os.environ.get("GEMINI_CONTEXT_CACHE_TTL", 3600))  # seconds
+
+# "retry in 37.5s" / "retry_delay { seconds: 37 }" in quota errors
+_RETRY_HINT_RES = (
+    re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.I),
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)", re.I),
+)
+
+_models = {}
+_models_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(GEMINI_CONCURRENCY)
+
+_prefixed_models = {}    # (model_name, prefix version) -> (model, expires_at)
+_prefixed_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_counters = Counter()
+_latencies = deque(maxlen=500)
+_first_chunk_latencies = deque(maxlen=500)
+_by_tag = defaultdict(Counter)   # per-caller totals, e.g. one per scoring mode
+
+
+class GeminiError(Exception):
+    """A Gemini call failed permanently or ran out of retries."""
+
+
+class StreamAborted(Exception):
+    """Raised by an on_text callback to stop a streaming call early."""
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute; acquire() blocks until enough are available."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1):
+        """Take amount units, waiting as needed. Returns seconds waited."""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def adjust(self, amount):
+        """Charge (positive) or refund (negative) units after the fact."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+_requests_bucket = TokenBucket(GEMINI_RPM)
+_tokens_bucket = TokenBucket(GEMINI_TPM)
+
+
+class CallResult:
+    """Text of one generation plus its accounting."""
+
+    def __init__(self, text, latency, prompt_tokens, output_tokens, attempts,
+                 first_chunk_latency=None):
+        self.text = text
+        self.latency = latency
+        self.first_chunk_latency = first_chunk_latency  # streaming only
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+        self.attempts = attempts
+
+
+def set_backend(name):
+    """Switch backend (e.g. to "local" when google-generativeai is missing)."""
+    global LLM_BACKEND
+    LLM_BACKEND = name
+
+
+def model_id(model_name=GEMINI_MODEL):
+    """Name identifying answers from this backend (local answers are cached apart)."""
+    return model_name if LLM_BACKEND == "gemini" else f"{LLM_BACKEND}:{model_name}"
+
+
+def get_model(model_name=GEMINI_MODEL):
+    """Shared model for model_name on the current backend (created once)."""
+    key = (LLM_BACKEND, model_name)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            if LLM_BACKEND == "local":
+                model = local_llm.LocalModel(model_name)
+            else:
+                import google.generativeai as genai
+                model = genai.GenerativeModel(model_name)
+            _models[key] = model
+        return model
+
+
+def prefix_version(prefix):
+    """Short content hash identifying a prompt prefix."""
+    return hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:12]
+
+
+def get_prefixed_model(prefix, model_name=GEMINI_MODEL):
+    """
+    Shared model with prefix preloaded, reused while the prefix is unchanged.
+
+    The prefix is registered as cached content so its tokens are not
+    re-processed on every call; if the model or prefix size does not
+    support context caching, it is sent as the system instruction instead.
+    """
+    key = (LLM_BACKEND, model_name, prefix_version(prefix))
+    with _prefixed_lock:
+        entry = _prefixed_models.get(key)
+        if entry is not None and entry[1] > time.time():
+            return entry[0]
+
+        if LLM_BACKEND == "local":
+            model = local_llm.LocalModel(model_name, system_instruction=prefix, cached=True)
+            _prefixed_models[key] = (model, float("inf"))
+            return model
+
+        import google.generativeai as genai
+        try:
+            from google.generativeai import caching
+            cache = caching.CachedContent.create(
+                model=model_name,
+                display_name=f"prefix-{key[2]}",
+                system_instruction=prefix,
+                ttl=timedelta(seconds=GEMINI_CONTEXT_CACHE_TTL),
+            )
+            model = genai.GenerativeModel.from_cached_content(cached_content=cache)
+            # Recreate a little before the server drops it
+            expires_at = time.time() + GEMINI_CONTEXT_CACHE_TTL - 60
+            _record("context_caches_created")
+            print(f"  📌 Registered cached prompt prefix {key[2]} ({estimate_tokens(prefix)} tokens)")
+        except Exception as e:
+            model = genai.GenerativeModel(model_name, system_instruction=prefix)
+            expires_at = float("inf")
+            _record("context_cache_fallbacks")
+            print(f"  ⚠️  Context caching unavailable ({e}), "
+                  f"sending prefix {key[2]} as system instruction")
+
+        _prefixed_models[key] = (model, expires_at)
+        return model
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _retry_hint(error):
+    """Server-suggested wait in seconds, if the error carries one."""
+    for pattern in _RETRY_HINT_RES:
+        match = pattern.search(str(error))
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def _backoff(attempt, hint=None):
+    """Full-jitter exponential backoff, never shorter than the server's hint."""
+    delay = random.uniform(0, min(GEMINI_BACKOFF_MAX, GEMINI_BACKOFF_BASE * (2 ** attempt)))
+    if hint is not None:
+        delay = max(delay, min(hint, GEMINI_BACKOFF_MAX))
+    return delay
+
+
+def _usage(response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None, None, None
+    return (getattr(usage, "prompt_token_count", None),
+            getattr(usage, "candidates_token_count", None),
+            getattr(usage, "cached_content_token_count", None))
+
+
+def _record(event, n=1):
+    with _stats_lock:
+        _counters[event] += n
+
+
+def _stream_text(response, on_text, started):
+    """Consume a streaming response, passing each chunk to on_text. Returns (text, ttfc)."""
+    parts = []
+    first_chunk_latency = None
+    for chunk in response:
+        try:
+            piece = chunk.text
+        except ValueError:
+            continue  # chunk without text parts (e.g. only safety metadata)
+        if first_chunk_latency is None:
+            first_chunk_latency = time.monotonic() - started
+        parts.append(piece)
+        on_text(piece)
+    return "".join(parts), first_chunk_latency
+
+
+def generate(prompt, model_name=GEMINI_MODEL, retries=GEMINI_RETRIES, on_text=None,
+             prefix=None, tag=None, **kwargs):
+    """
+    Run one generate_content call under the shared limits.
+
+    Args:
+        prompt (str): Full prompt text
+        model_name (str): Gemini model
+        retries (int): Retry attempts for 429/5xx/timeouts
+        on_text (callable): Stream the response, calling on_text(chunk) as
+            text arrives; it may raise StreamAborted to stop early. A stream
+            that already delivered text is not retried.
+        prefix (str): Static leading instructions, sent through
+            get_prefixed_model() instead of as part of prompt
+        tag (str): Label for per-caller totals in stats()
+        **kwargs: Passed to generate_content (e.g. generation_config)
+
+    Returns:
+        CallResult
+
+    Raises:
+        GeminiError: non-retryable error, or retries exhausted
+        StreamAborted: raised by on_text
+    """
+    if prefix:
+        model = get_prefixed_model(prefix, model_name)
+        estimated = estimate_tokens(prompt) + estimate_tokens(prefix)
+    else:
+        model = get_model(model_name)
+        estimated = estimate_tokens(prompt)
+
+    for attempt in range(retries + 1):
+        waited = _requests_bucket.acquire(1) + _tokens_bucket.acquire(estimated)
+        if waited:
+            _record("throttled_calls")
+            _record("throttled_seconds", waited)
+
+        first_chunk_latency = None
+        try:
+            with _slots:
+                started = time.monotonic()
+                response = model.generate_content(
+                    prompt, stream=on_text is not None,
+                    request_options={"timeout": GEMINI_TIMEOUT}, **kwargs
+                )
+                if on_text is None:
+                    text = response.text
+                else:
+                    text, first_chunk_latency = _stream_text(response, on_text, started)
+        except StreamAborted:
+            _record("aborted_streams")
+            raise
+        except RETRYABLE_ERRORS as e:
+            if attempt == retries or first_chunk_latency is not None:
+                _record("failures")
+                raise GeminiError(f"Gemini failed after {attempt + 1} attempts: {e}") from e
+            delay = _backoff(attempt, _retry_hint(e))
+            _record("retries")
+            print(f"  🔁 Gemini {type(e).__name__}, retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 1}/{retries})")
+            time.sleep(delay)
+            continue
+        except Exception as e:
+            _record("failures")
+            raise GeminiError(f"Gemini request failed: {e}") from e
+
+        latency = time.monotonic() - started
+        prompt_tokens, output_tokens, cached_tokens = _usage(response)
+        # Settle the TPM reservation with the real usage when it is reported
+        if prompt_tokens is not None:
+            _tokens_bucket.adjust(prompt_tokens + (output_tokens or 0) - estimated)
+
+        with _stats_lock:
+            _counters["calls"] += 1
+            _counters["prompt_tokens"] += prompt_tokens or estimated
+            _counters["output_tokens"] += output_tokens or 0
+            _counters["cached_prompt_tokens"] += cached_tokens or 0
+            _latencies.append(latency)
+            if tag is not None:
+                totals = _by_tag[tag]
+                totals["calls"] += 1
+                totals["prompt_tokens"] += prompt_tokens or estimated
+                totals["cached_prompt_tokens"] += cached_tokens or 0
+                totals["output_tokens"] += output_tokens or 0
+                totals["latency_ms"] += int(latency * 1000)
+            if first_chunk_latency is not None:
+                _counters["streamed_calls"] += 1
+                _first_chunk_latencies.append(first_chunk_latency)
+
+        first_chunk = f" (first chunk {first_chunk_latency:.1f}s)" if first_chunk_latency else ""
+        print(f"  🧠 Gemini call: {latency:.1f}s{first_chunk}, "
+              f"{prompt_tokens or estimated} prompt / {output_tokens or '?'} output tokens")
+        return CallResult(text, latency, prompt_tokens, output_tokens, attempt + 1,
+                          first_chunk_latency)
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 3)
+
+
+def stats():
+    """Call, retry, throttling, token and latency totals since startup."""
+    with _stats_lock:
+        counters = dict(_counters)
+        latencies = list(_latencies)
+        first_chunk_latencies = list(_first_chunk_latencies)
+        by_tag = {tag: dict(totals) for tag, totals in _by_tag.items()}
+
+    counters["throttled_seconds"] = round(counters.get("throttled_seconds", 0), 1)
+    return {
+        "model": GEMINI_MODEL,
+        "backend": LLM_BACKEND,
+        "limits": {"concurrency": GEMINI_CONCURRENCY, "rpm": GEMINI_RPM, "tpm": GEMINI_TPM},
+        "counters": counters,
+        "latency_seconds": {
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "max": round(max(latencies), 3) if latencies else None,
+        },
+        "first_chunk_latency_seconds": {
+            "p50": _percentile(first_chunk_latencies, 0.5),
+            "p95": _percentile(first_chunk_latencies, 0.95),
+        },
+        "by_tag": by_tag,
+        **({"local": local_llm.stats()} if LLM_BACKEND == "local" else {}),
+    }
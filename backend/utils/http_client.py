@@ -0,0 +1,198 @@
+"""
+Shared HTTP client for plain-HTTP scraping
+Keep-alive connection pooling per host, HTTP/2 when httpx + h2 are
+installed, jittered retry/backoff for GETs, one timeout policy and an
+optional cap on downloaded body bytes (the body is streamed and the
+connection dropped once the cap is reached).
+"""
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+    import h2  # noqa: F401  (required by httpx for http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", 15))
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", 3))
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 10))  # per host (requests); httpx scales it client-wide
+HTML_MAX_BYTES = int(os.environ.get("HTML_MAX_BYTES", 2 * 1024 * 1024))
+HTTP_CHUNK_SIZE = 64 * 1024
+HTTP_BACKOFF_BASE = 0.5   # seconds
+HTTP_BACKOFF_MAX = 8.0    # seconds
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Connection-level failures worth retrying
+_TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout,
+                     requests.exceptions.ChunkedEncodingError)
+if HTTP2_AVAILABLE:
+    _TRANSIENT_ERRORS += (httpx.TransportError,)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class HTTPError(Exception):
+    """Raised by HttpResponse.raise_for_status() for 4xx/5xx responses."""
+
+    def __init__(self, status_code, url):
+        super().__init__(f"HTTP {status_code} for {url}")
+        self.status_code = status_code
+        self.url = url
+
+
+class HttpResponse:
+    """Backend-independent response (same fields whether httpx or requests served it)."""
+
+    def __init__(self, url, status_code, headers, content, http_version, truncated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.http_version = http_version
+        self.truncated = truncated  # body cut off at max_bytes
+
+    @property
+    def encoding(self):
+        """Charset from the Content-Type header, or None."""
+        content_type = self.headers.get("Content-Type") or ""
+        for param in content_type.split(";")[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "charset" and value:
+                return value.strip('"\' ')
+        return None
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPError(self.status_code, self.url)
+
+
+def _build_client():
+    if HTTP2_AVAILABLE:
+        return httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_MAXSIZE * 10,
+                max_keepalive_connections=HTTP_POOL_MAXSIZE * 2,
+            ),
+        )
+
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = _build_client()
+        return _client
+
+
+def _read_capped(chunks, max_bytes):
+    """Join streamed chunks, stopping after max_bytes. Returns (content, truncated)."""
+    body = bytearray()
+    for chunk in chunks:
+        body += chunk
+        if max_bytes is not None and len(body) >= max_bytes:
+            return bytes(body[:max_bytes]), True
+    return bytes(body), False
+
+
+def _send(url, headers, max_bytes=None):
+    client = _get_client()
+
+    if HTTP2_AVAILABLE:
+        with client.stream("GET", url, headers=headers) as response:
+            content, truncated = _read_capped(response.iter_bytes(HTTP_CHUNK_SIZE), max_bytes)
+            return HttpResponse(str(response.url), response.status_code, response.headers,
+                                content, response.http_version, truncated)
+
+    response = client.get(url, headers=headers, stream=True,
+                          timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    try:
+        content, truncated = _read_capped(response.iter_content(HTTP_CHUNK_SIZE), max_bytes)
+    finally:
+        response.close()
+    return HttpResponse(response.url, response.status_code, response.headers,
+                        content, "HTTP/1.1", truncated)
+
+
+def _retry_after_seconds(response):
+    """Server-provided Retry-After (seconds or HTTP date), or None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt, retry_after=None):
+    """Full-jitter exponential backoff, honoring Retry-After when given."""
+    if retry_after is not None:
+        return min(retry_after, HTTP_BACKOFF_MAX)
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+
+def get(url, headers=None, retries=HTTP_RETRIES, max_bytes=None):
+    """
+    GET with pooled connections and retries on connection errors/429/5xx.
+
+    Args:
+        url (str): URL to fetch
+        headers (dict): Extra request headers
+        retries (int): Retry attempts after the first try
+        max_bytes (int): Stop downloading the body after this many bytes
+            (response.truncated is set); None reads it all
+
+    Returns:
+        HttpResponse: last response received (check raise_for_status())
+
+    Raises:
+        The last connection/timeout error if every attempt failed to connect
+    """
+    for attempt in range(retries + 1):
+        try:
+            response = _send(url, headers, max_bytes)
+        except _TRANSIENT_ERRORS as e:
+            if attempt == retries:
+                raise
+            delay = _backoff(attempt)
+            print(f"    🔁 GET {url} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        if response.status_code not in RETRY_STATUSES or attempt == retries:
+            return response
+
+        delay = _backoff(attempt, _retry_after_seconds(response))
+        print(f"    🔁 GET {url} returned {response.status_code}, retrying in {delay:.1f}s")
+        time.sleep(delay)
@@ -0,0 +1,209 @@
+"""
+Tolerant local JSON repair for LLM output
+One pass over the text that fixes the usual slips without another API
+call: code fences and prose around the object, trailing and missing
+commas, unescaped quotes and raw newlines inside strings, Python
+literals (True/False/None), and output truncated mid-object (the open
+string is closed, a dangling key is dropped and brackets are closed).
+"""
+import re
+import json
+
+_FENCE_RE = re.compile(r'```(?:json)?', re.I)
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_VALUE_STARTS = set('"{[]}-0123456789')
+_TOKEN_END = set(' \t\r\n,:]}')
+_KEY_AHEAD_RE = re.compile(r'"(?:[^"\\\n]|\\.)*"\s*:')
+
+
+class RepairFailed(ValueError):
+    """Text could not be turned into JSON."""
+
+
+class _Frame:
+    """An open object or array and what it expects next."""
+
+    def __init__(self, closer):
+        self.closer = closer                # "}" or "]"
+        self.expect = "key" if closer == "}" else "value"
+        self.key_start = None               # out index where the current key began
+
+    @property
+    def is_object(self):
+        return self.closer == "}"
+
+
+def _skip_space(text, i):
+    while i < len(text) and text[i].isspace():
+        i += 1
+    return i
+
+
+def _next_significant(text, i):
+    i = _skip_space(text, i)
+    return text[i] if i < len(text) else ""
+
+
+def _closes_string(text, i):
+    """Is the quote at text[i] the end of the string (vs. an unescaped inner quote)?"""
+    j = _skip_space(text, i + 1)
+    if j >= len(text) or text[j] in ":}]":
+        return True
+    if text[j] == '"':
+        # Comma forgotten before the next value (new line) or key ("k":)
+        return "\n" in text[i:j] or (j > i + 1 and bool(_KEY_AHEAD_RE.match(text, j)))
+    if text[j] != ",":
+        return False
+    # A comma only ends the string if a JSON value or key follows it
+    k = _skip_space(text, j + 1)
+    return k >= len(text) or text[k] in _VALUE_STARTS or text.startswith(("true", "false", "null"), k)
+
+
+def _is_scalar(token):
+    try:
+        json.loads(token)
+        return True
+    except ValueError:
+        return False
+
+
+def repair(text):
+    """
+    Parse text as JSON, repairing it if needed.
+
+    Returns:
+        (object, bool): the parsed value and whether repair was needed
+
+    Raises:
+        RepairFailed: nothing resembling a JSON object or array was found
+    """
+    text = _FENCE_RE.sub("", text or "").strip()
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise RepairFailed("no JSON object or array in output")
+
+    out = []
+    stack = []
+    in_string = is_key = False
+    string_start = None
+    i = min(starts)
+
+    def value_done():
+        if stack:
+            stack[-1].expect = "comma"
+
+    def close(frame):
+        if frame.is_object and frame.expect in ("colon", "value"):
+            del out[frame.key_start:]           # key without a value
+        while out and (out[-1].isspace() or out[-1] == ","):
+            out.pop()
+        out.append(frame.closer)
+
+    def before_value():
+        """Insert a missing comma when a value directly follows another."""
+        top = stack[-1] if stack else None
+        if top is not None and top.expect == "comma":
+            out.append(",")
+            top.expect = "key" if top.is_object else "value"
+
+    while i < len(text):
+        ch = text[i]
+
+        if in_string:
+            if ch == "\\" and i + 1 < len(text):
+                out.append(text[i:i + 2])
+                i += 2
+                continue
+            if ch == '"':
+                if _closes_string(text, i):
+                    out.append(ch)
+                    in_string = False
+                    if is_key:
+                        stack[-1].expect = "colon"
+                    else:
+                        value_done()
+                else:
+                    out.append('\\"')
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch in "\r\t":
+                out.append("\\r" if ch == "\r" else "\\t")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch.isspace():
+            out.append(ch)
+        elif ch == '"':
+            before_value()
+            top = stack[-1] if stack else None
+            is_key = top is not None and top.is_object and top.expect == "key"
+            if is_key:
+                top.key_start = len(out)
+            string_start = len(out)
+            in_string = True
+            out.append(ch)
+        elif ch == ":":
+            if stack and stack[-1].expect == "colon":
+                stack[-1].expect = "value"
+                out.append(ch)
+        elif ch == ",":
+            top = stack[-1] if stack else None
+            # Drop trailing and doubled commas
+            if top is not None and top.expect == "comma" and _next_significant(text, i + 1) not in "}]":
+                out.append(ch)
+                top.expect = "key" if top.is_object else "value"
+        elif ch in "{[":
+            before_value()
+            if stack:
+                stack[-1].expect = "nested"     # value in progress
+            stack.append(_Frame("}" if ch == "{" else "]"))
+            out.append(ch)
+        elif ch in "}]":
+            if not stack:
+                break
+            close(stack.pop())
+            if not stack:
+                break                           # ignore anything after the top-level value
+            value_done()
+        else:
+            end = i
+            while end < len(text) and text[end] not in _TOKEN_END:
+                end += 1
+            token = _LITERALS.get(text[i:end], text[i:end])
+            if end == len(text) and not _is_scalar(token):
+                pass                            # cut off mid-token: drop it
+            elif stack and not (stack[-1].is_object and stack[-1].expect in ("key", "colon")):
+                before_value()
+                out.append(token)
+                value_done()
+            i = end
+            continue
+        i += 1
+
+    # --------------------------------------
+    # TRUNCATED OUTPUT: CLOSE WHAT IS STILL OPEN
+    # --------------------------------------
+    if in_string:
+        if is_key:
+            del out[string_start:]
+            stack[-1].expect = "key"
+        else:
+            if out and out[-1] == "\\":
+                out.pop()
+            out.append('"')
+            value_done()
+
+    while stack:
+        close(stack.pop())
+
+    try:
+        return json.loads("".join(out)), True
+    except ValueError as e:
+        raise RepairFailed(f"could not repair output: {e}") from e
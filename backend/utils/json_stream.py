@@ -0,0 +1,115 @@
+"""
+Incremental JSON parsing for streamed LLM output
+Watches text as it arrives, yields each element of one top-level array
+(e.g. "phase_scores") as soon as its closing brace is seen, and flags
+output that has clearly gone malformed so the stream can be aborted.
+"""
+import re
+import json
+
+# Output must open a JSON object within this many characters
+MAX_PREAMBLE_CHARS = 200
+
+_FENCE_RE = re.compile(r'^\s*(```(?:json)?\s*)?', re.I)
+
+
+class MalformedStream(Exception):
+    """Streamed output can no longer turn into the expected JSON."""
+
+
+class ArrayElementStream:
+    """
+    Feed text chunks; returns completed elements of the array under `key`.
+
+    Only string-aware bracket matching is done while streaming; the full
+    response is still parsed normally once the stream ends.
+    """
+
+    def __init__(self, key):
+        self._key_re = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self.buffer = ""
+        self.elements = []
+        self._pos = None          # scan position inside the array, once found
+        self._start = None        # start index of the element being read
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._done = False
+        self._checked_preamble = False
+
+    def _check_preamble(self):
+        body = self.buffer[_FENCE_RE.match(self.buffer).end():].lstrip()
+        if body:
+            if body[0] != "{":
+                raise MalformedStream(f"output does not start with a JSON object: {body[:40]!r}")
+            self._checked_preamble = True
+        elif len(self.buffer) > MAX_PREAMBLE_CHARS:
+            raise MalformedStream("no JSON object in the first characters of output")
+
+    def feed(self, chunk):
+        """
+        Add streamed text.
+
+        Returns:
+            list: elements completed by this chunk (parsed dicts)
+
+        Raises:
+            MalformedStream: output cannot be the expected JSON
+        """
+        self.buffer += chunk
+        if not self._checked_preamble:
+            self._check_preamble()
+        if self._done:
+            return []
+
+        if self._pos is None:
+            match = self._key_re.search(self.buffer)
+            if not match:
+                return []
+            self._pos = match.end()
+
+        completed = []
+        text = self.buffer
+        i = self._pos
+        while i < len(text):
+            ch = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                if self._depth == 0:
+                    raise MalformedStream("bare string where an array element was expected")
+                self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth < 0:
+                    raise MalformedStream("unbalanced closing brace")
+                if self._depth == 0:
+                    completed.append(self._parse(text[self._start:i + 1]))
+                    self._start = None
+            elif ch == "]" and self._depth == 0:
+                self._done = True
+                i += 1
+                break
+            elif self._depth == 0 and not (ch.isspace() or ch == ","):
+                raise MalformedStream(f"unexpected {ch!r} between array elements")
+            i += 1
+
+        self._pos = i
+        self.elements.extend(completed)
+        return completed
+
+    def _parse(self, raw):
+        try:
+            return json.loads(raw)
+        except ValueError as e:
+            raise MalformedStream(f"array element is not valid JSON: {e}") from e
@@ -0,0 +1,164 @@
+"""
+Persistent LLM response cache
+Parsed Gemini responses are stored on disk under a hash of the model
+name, the prompt template version and the normalized input (prompt text
+plus the data sent with it, minus volatile fields such as screenshot
+paths). Re-analyzing an unchanged page returns the stored result
+without calling the API. Size is bounded with least-recently-used
+eviction; entries can optionally expire after LLM_CACHE_TTL.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import Counter
+
+LLM_CACHE = os.environ.get("LLM_CACHE", "1") != "0"
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "backend/cache/llm_cache.db")
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", 0))  # seconds, 0 = never expire
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+
+# Bump when prompt templates change in a way that should invalidate old answers
+PROMPT_VERSION = "2"
+
+# Data fields that change between runs without changing what is analyzed
+VOLATILE_KEYS = {"screenshot", "screenshot_variants", "generated_at", "job_id"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    model       TEXT NOT NULL,
+    stored_at   REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size        INTEGER NOT NULL,
+    payload     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+"""
+
+_local = threading.local()
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(LLM_CACHE_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(LLM_CACHE_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _count(event, n=1):
+    with _counters_lock:
+        _counters[event] += n
+
+
+def _strip_volatile(obj):
+    if isinstance(obj, dict):
+        return {k: _strip_volatile(v) for k, v in obj.items() if k not in VOLATILE_KEYS}
+    if isinstance(obj, list):
+        return [_strip_volatile(v) for v in obj]
+    if isinstance(obj, str):
+        return " ".join(obj.split())
+    return obj
+
+
+def make_key(model, prompt, data=None):
+    """Content fingerprint for one LLM call (whitespace-insensitive)."""
+    fingerprint = json.dumps(
+        {
+            "model": model,
+            "prompt_version": PROMPT_VERSION,
+            "prompt": " ".join(prompt.split()),
+            "data": _strip_volatile(data),
+        },
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+def get(key):
+    """Cached parsed response for key, or None (miss, expired or cache disabled)."""
+    if not LLM_CACHE:
+        return None
+
+    conn = _connect()
+    row = conn.execute(
+        "SELECT payload, stored_at FROM responses WHERE key = ?", (key,)
+    ).fetchone()
+
+    if row is None or (LLM_CACHE_TTL and time.time() - row[1] > LLM_CACHE_TTL):
+        _count("misses")
+        return None
+
+    with conn:
+        conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+    _count("hits")
+    return json.loads(row[0])
+
+
+def put(key, model, response):
+    """Store a successfully parsed response."""
+    if not LLM_CACHE:
+        return
+
+    data = json.dumps(response, ensure_ascii=False)
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO responses (key, model, stored_at, accessed_at, size, payload)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (key, model, now, now, len(data), data),
+        )
+    _count("stores")
+    _evict(conn)
+
+
+def _evict(conn):
+    """Drop least-recently-used responses until under LLM_CACHE_MAX_BYTES."""
+    (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+    if total <= LLM_CACHE_MAX_BYTES:
+        return
+
+    evicted = 0
+    with conn:
+        for key, size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            if total <= LLM_CACHE_MAX_BYTES:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+    _count("evictions", evicted)
+
+
+def stats():
+    """Hit/miss counters plus current cache size."""
+    with _counters_lock:
+        counters = dict(_counters)
+
+    if not LLM_CACHE:
+        return {"enabled": False, "counters": counters}
+
+    entries, size = _connect().execute(
+        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+    ).fetchone()
+    return {
+        "enabled": True,
+        "ttl_seconds": LLM_CACHE_TTL or None,
+        "entries": entries,
+        "bytes": size,
+        "max_bytes": LLM_CACHE_MAX_BYTES,
+        "counters": counters,
+    }
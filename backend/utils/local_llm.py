@@ -0,0 +1,505 @@
+"""
+Local Gemini stand-in
+A drop-in for GenerativeModel (LLM_BACKEND=local) that answers without
+the network: portfolio and case-study responses are built from the
+prompt's own page data and match utils.schemas, so reports render like
+real ones. Latency (lognormal), output token rate, per-minute request
+and token quotas (429 with a retry hint), injected 429/500 errors,
+truncated output and streaming are all configurable, so concurrency,
+caching and retry behavior can be benchmarked offline.
+
+Profiles (LOCAL_LLM_PROFILE) set every knob at once; any LOCAL_LLM_<KNOB>
+env var overrides the profile. Answers are deterministic for a prompt;
+injected failures are deterministic for a prompt and attempt number.
+"""
+import os
+import re
+import json
+import math
+import time
+import random
+import hashlib
+import threading
+from collections import Counter, OrderedDict, deque
+from urllib.parse import urlparse
+
+PROFILES = {
+    # No delays or failures (the default for development without an API key)
+    "instant": {
+        "latency_ms": 0, "latency_sigma": 0.0, "tokens_per_second": 0,
+        "error_429": 0.0, "error_500": 0.0, "malformed": 0.0, "rpm": 0, "tpm": 0,
+    },
+    "realistic": {
+        "latency_ms": 900, "latency_sigma": 0.6, "tokens_per_second": 150,
+        "error_429": 0.02, "error_500": 0.01, "malformed": 0.02, "rpm": 60, "tpm": 1_000_000,
+    },
+    "flaky": {
+        "latency_ms": 1500, "latency_sigma": 0.9, "tokens_per_second": 100,
+        "error_429": 0.15, "error_500": 0.08, "malformed": 0.1, "rpm": 30, "tpm": 250_000,
+    },
+}
+
+LOCAL_LLM_PROFILE = os.environ.get("LOCAL_LLM_PROFILE", "instant")
+LOCAL_LLM_SEED = os.environ.get("LOCAL_LLM_SEED", "0")
+CHARS_PER_TOKEN = 4
+STREAM_CHUNK_CHARS = 200
+MAX_TRACKED_PROMPTS = 10_000   # failing prompts whose attempt count is kept
+
+
+def _settings():
+    settings = dict(PROFILES.get(LOCAL_LLM_PROFILE, PROFILES["instant"]))
+    for knob, default in settings.items():
+        raw = os.environ.get(f"LOCAL_LLM_{knob.upper()}")
+        if raw is not None:
+            settings[knob] = type(default)(float(raw)) if isinstance(default, int) else float(raw)
+    return settings
+
+
+SETTINGS = _settings()
+
+_counters = Counter()
+_lock = threading.Lock()
+_window = deque()            # (timestamp, tokens) of requests in the last minute
+_attempts = OrderedDict()    # prompt hash -> calls seen (LRU), for per-attempt failures
+_in_flight = {"now": 0, "max": 0}
+
+
+class LocalLLMError(Exception):
+    """Base for simulated API errors; code mirrors the HTTP status."""
+    code = 500
+
+
+class RateLimited(LocalLLMError):
+    code = 429
+
+
+class ServerError(LocalLLMError):
+    code = 500
+
+
+class Timeout(LocalLLMError):
+    code = 504
+
+
+def _count(event, n=1):
+    with _lock:
+        _counters[event] += n
+
+
+def _tokens(text):
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+# ---------------------------------------
+# RESPONSE OBJECTS (shaped like google.generativeai's)
+# ---------------------------------------
+class _Usage:
+    def __init__(self, prompt_tokens, output_tokens, cached_tokens):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.cached_content_token_count = cached_tokens
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class LocalResponse:
+    """Full text, or an iterator of paced chunks when streamed."""
+
+    def __init__(self, text, usage, chunk_delay=0.0, stream=False, on_done=None):
+        self.text = text
+        self.usage_metadata = usage
+        self._chunk_delay = chunk_delay
+        self._stream = stream
+        self._on_done = on_done
+
+    def __iter__(self):
+        try:
+            if not self._stream:
+                yield _Chunk(self.text)
+                return
+            for start in range(0, len(self.text), STREAM_CHUNK_CHARS):
+                if self._chunk_delay:
+                    time.sleep(self._chunk_delay)
+                yield _Chunk(self.text[start:start + STREAM_CHUNK_CHARS])
+        finally:
+            if self._on_done is not None:
+                self._on_done()
+                self._on_done = None
+
+
+# ---------------------------------------
+# MODEL
+# ---------------------------------------
+class LocalModel:
+    """
+    Stand-in for genai.GenerativeModel. system_instruction plays the role
+    of a cached prefix when cached=True (its tokens are reported as cached).
+    """
+
+    def __init__(self, model_name, system_instruction=None, cached=False):
+        self.model_name = model_name
+        self.system_instruction = system_instruction or ""
+        self.cached = cached
+
+    def generate_content(self, contents, stream=False, request_options=None,
+                         generation_config=None, **kwargs):
+        prompt = f"{self.system_instruction}\n{contents}"
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with _lock:
+            attempt = _attempts.pop(digest, 0) + 1
+            _attempts[digest] = attempt
+            if len(_attempts) > MAX_TRACKED_PROMPTS:
+                _attempts.popitem(last=False)
+        rng = random.Random(f"{LOCAL_LLM_SEED}:{digest}:{attempt}")
+
+        config = generation_config or {}
+        schema = config.get("response_schema")
+        as_json = config.get("response_mime_type") == "application/json"
+        text = render(prompt, schema, fenced=not as_json)
+
+        if SETTINGS["malformed"] and rng.random() < SETTINGS["malformed"]:
+            text = text[:int(len(text) * 0.85)]      # cut off, as with max_output_tokens
+            _count("injected_malformed")
+
+        prompt_tokens = _tokens(prompt)
+        output_tokens = _tokens(text)
+        self._admit(rng, prompt_tokens + output_tokens)
+
+        latency = 0.0
+        if SETTINGS["latency_ms"]:
+            median = SETTINGS["latency_ms"] / 1000
+            latency = rng.lognormvariate(math.log(median), SETTINGS["latency_sigma"])
+        generation = output_tokens / SETTINGS["tokens_per_second"] if SETTINGS["tokens_per_second"] else 0.0
+
+        timeout = (request_options or {}).get("timeout")
+        if timeout and latency + generation > timeout:
+            time.sleep(timeout)
+            _count("timeouts")
+            raise Timeout(f"504 Deadline exceeded after {timeout}s")
+
+        # Answered: a later call with this prompt starts again at attempt 1
+        with _lock:
+            _attempts.pop(digest, None)
+
+        cached_tokens = _tokens(self.system_instruction) if self.cached and self.system_instruction else 0
+        usage = _Usage(prompt_tokens, output_tokens, cached_tokens)
+        _count("calls")
+        _count("output_tokens", output_tokens)
+
+        _request_started()
+        time.sleep(latency)
+        if stream:
+            # Still in flight until the caller has read the last chunk
+            chunks = max(1, math.ceil(len(text) / STREAM_CHUNK_CHARS))
+            return LocalResponse(text, usage, chunk_delay=generation / chunks, stream=True,
+                                 on_done=_request_finished)
+        time.sleep(generation)
+        _request_finished()
+        return LocalResponse(text, usage)
+
+    def _admit(self, rng, tokens):
+        """Apply injected errors and the per-minute quotas."""
+        if rng.random() < SETTINGS["error_500"]:
+            _count("injected_500")
+            raise ServerError("500 An internal error has occurred")
+        if rng.random() < SETTINGS["error_429"]:
+            _count("injected_429")
+            raise RateLimited(f"429 Resource has been exhausted. Please retry in {rng.uniform(1, 5):.1f}s.")
+
+        rpm, tpm = SETTINGS["rpm"], SETTINGS["tpm"]
+        if not rpm and not tpm:
+            return
+        now = time.monotonic()
+        with _lock:
+            while _window and now - _window[0][0] >= 60:
+                _window.popleft()
+            used = sum(t for _, t in _window)
+            if (rpm and len(_window) >= rpm) or (tpm and used + tokens > tpm):
+                wait = 60 - (now - _window[0][0]) if _window else 1.0
+                _counters["quota_429"] += 1
+                raise RateLimited(f"429 Quota exceeded for requests per minute. "
+                                  f"Please retry in {wait:.1f}s.")
+            _window.append((now, tokens))
+
+
+def _request_started():
+    with _lock:
+        _in_flight["now"] += 1
+        _in_flight["max"] = max(_in_flight["max"], _in_flight["now"])
+
+
+def _request_finished():
+    with _lock:
+        _in_flight["now"] -= 1
+
+
+def stats():
+    """Simulated call, error and concurrency counts since startup."""
+    with _lock:
+        counters = dict(_counters)
+        max_in_flight = _in_flight["max"]
+    return {
+        "profile": LOCAL_LLM_PROFILE,
+        "settings": SETTINGS,
+        "counters": counters,
+        "max_in_flight": max_in_flight,
+    }
+
+
+# ---------------------------------------
+# ANSWERS DERIVED FROM THE PROMPT
+# ---------------------------------------
+# Mirrors the rubric in casestudies.CASE_STUDY_RUBRIC: (phase, max, subsections)
+# with the words that count as evidence for each subsection
+PHASES = [
+    ("Research & Insights", 15, [
+        ("Secondary research", 5, ["market", "competitor", "secondary", "benchmark", "desk research"]),
+        ("Primary research", 5, ["interview", "survey", "user research", "participant", "contextual inquiry"]),
+        ("Quality & depth of insights", 5, ["insight", "pain point", "persona", "finding", "journey"]),
+    ]),
+    ("Context, Domain & Problem Definition", 15, [
+        ("Problem statement clarity", 5, ["problem", "challenge", "goal", "objective"]),
+        ("Business context & target audience", 5, ["business", "stakeholder", "audience", "customer", "users"]),
+        ("Success metrics defined", 5, ["metric", "kpi", "success", "conversion", "retention"]),
+    ]),
+    ("Ideation & Design Process", 20, [
+        ("Brainstorming & ideation", 5, ["brainstorm", "ideation", "workshop", "concept", "crazy 8"]),
+        ("Design iterations", 5, ["iteration", "iterate", "version", "revised", "refine"]),
+        ("Wireframes/sketches/prototypes", 5, ["wireframe", "sketch", "prototype", "lo-fi", "mockup"]),
+        ("Design decision rationale", 5, ["because", "decided", "rationale", "trade-off", "chose"]),
+    ]),
+    ("Visual Design & UX/UI Quality", 20, [
+        ("Visual hierarchy & aesthetics", 5, ["visual", "hierarchy", "typography", "color", "colour"]),
+        ("Layout, grids & design system", 6, ["grid", "layout", "design system", "component", "spacing"]),
+        ("Accessibility", 3, ["accessib", "contrast", "wcag", "screen reader"]),
+        ("UX copywriting", 3, ["copy", "microcopy", "tone", "wording"]),
+        ("Microinteractions & feedback", 3, ["animation", "microinteraction", "transition", "hover", "loading state"]),
+    ]),
+    ("Validation & Iteration", 15, [
+        ("Usability testing", 5, ["usability", "user testing", "tested", "a/b", "test session"]),
+        ("Feedback incorporation", 5, ["feedback", "learned", "improved", "based on"]),
+        ("Metrics & results", 5, ["increase", "decrease", "%", "result", "impact"]),
+    ]),
+    ("Storytelling & UX Copywriting", 10, [
+        ("Narrative flow", 3, ["overview", "process", "outcome", "conclusion", "next steps"]),
+        ("Presentation & visuals", 3, []),
+        ("Writing quality", 4, []),
+    ]),
+    ("Bonus Points", 5, [
+        ("Gamification", 2, ["gamif", "badge", "reward", "streak", "leaderboard"]),
+        ("Innovation", 2, ["innovat", "novel", "first-of", "machine learning", " ai "]),
+        ("Systems thinking", 1, ["ecosystem", "system", "scalab", "platform"]),
+    ]),
+]
+
+SKILL_TERMS = [
+    "UX research", "User research", "UI design", "Interaction design", "Visual design",
+    "Prototyping", "Wireframing", "Usability testing", "Design systems", "Information architecture",
+    "Figma", "Sketch", "Adobe XD", "Framer", "Branding", "Motion design", "Accessibility",
+]
+SOCIAL_HOSTS = {
+    "linkedin.com": "LinkedIn", "dribbble.com": "Dribbble", "behance.net": "Behance",
+    "twitter.com": "Twitter", "x.com": "X", "instagram.com": "Instagram",
+    "github.com": "GitHub", "medium.com": "Medium",
+}
+_NON_PROJECT_PATHS = re.compile(r"^/?(about|contact|resume|cv|blog|home|index|privacy|terms)?/?$", re.I)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_PROJECT_BLOCK_RE = re.compile(r"^-+\nPROJECT (\d+): (\S+)\n-+$", re.M)
+
+
+def render(prompt, schema=None, fenced=False):
+    """JSON text answering prompt, restricted to schema's properties when given."""
+    if "MULTIPLE CASE STUDIES" in prompt:
+        answer = _batch(prompt)
+    elif "UX Case Study Scoring Model" in prompt:
+        answer = _case_study(prompt)
+    else:
+        answer = _portfolio(prompt)
+
+    properties = (schema or {}).get("properties")
+    if properties:
+        answer = {key: answer[key] for key in properties if key in answer}
+
+    text = json.dumps(answer, indent=2, ensure_ascii=False)
+    return f"```json\n{text}\n```" if fenced else text
+
+
+def _line(prompt, label, default=""):
+    match = re.search(rf"^{re.escape(label)}: ?(.*)$", prompt, re.M)
+    return match.group(1).strip() if match else default
+
+
+def _section(prompt, header):
+    """The line after a 'HEADER (...):' line (page data is one line per section)."""
+    match = re.search(rf"^{re.escape(header)}[^\n]*:\n(.*)$", prompt, re.M)
+    return match.group(1).strip() if match else ""
+
+
+def _sentences(text):
+    return [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if len(s.strip()) > 20]
+
+
+# ---------------------------------------
+# CASE STUDY
+# ---------------------------------------
+def _case_study(prompt, link=None):
+    title = _line(prompt, "Title", "Untitled case study")
+    text = _section(prompt, "TEXT CONTENT")
+    try:
+        images = int(_line(prompt, "Total Images", "0"))
+    except ValueError:
+        images = 0
+    lower = f" {text.lower()} "
+
+    phase_scores, keywords, gaps = [], [], []
+    for phase, phase_max, subsections in PHASES:
+        subs = []
+        for name, sub_max, words in subsections:
+            if name == "Presentation & visuals":
+                coverage = min(1.0, images / 8)
+                found = [f"{images} images"] if images else []
+            elif name == "Writing quality":
+                coverage = min(1.0, len(text) / 4000)
+                found = [f"{len(text)} characters of text"] if text else []
+            else:
+                found = [w.strip() for w in words if w in lower]
+                coverage = min(1.0, len(found) / 2)
+                keywords.extend(found)
+            score = round(sub_max * coverage * 2) / 2
+            reasoning = (f"Evidence on the page: {', '.join(found)}." if found
+                         else f"The page text shows no evidence of {name.lower()}.")
+            subs.append({"name": name, "score": score, "max_score": sub_max, "reasoning": reasoning})
+            if coverage < 0.5:
+                gaps.append((coverage, phase, name))
+
+        score = sum(sub["score"] for sub in subs)
+        phase_scores.append({
+            "phase": phase,
+            "score": score,
+            "max_score": phase_max,
+            "reasoning": f"{title} scores {score}/{phase_max} on {phase.lower()} "
+                         f"based on what the page documents.",
+            "subsections": subs,
+        })
+
+    overall = round(sum(p["score"] for p in phase_scores))
+    ranked = sorted(phase_scores, key=lambda p: p["score"] / p["max_score"])
+    strongest, weakest = ranked[-1]["phase"], ranked[0]["phase"]
+    verdict = ("Strong, well-evidenced case study" if overall >= 75
+               else "Solid case study with gaps in evidence" if overall >= 50
+               else "Case study needs more process and outcome detail")
+
+    return {
+        "overall_score": overall,
+        "phase_scores": phase_scores,
+        "summary": f"{title} is strongest in {strongest.lower()} and weakest in "
+                   f"{weakest.lower()}. The score reflects the research, process and "
+                   f"results the page describes in its {len(text)} characters of text "
+                   f"and {images} images.",
+        "ux_keywords": list(dict.fromkeys(keywords))[:8],
+        "improvements": [
+            {
+                "phase": phase,
+                "issue": f"Little evidence of {name.lower()}",
+                "recommendation": f"Add a section documenting {name.lower()} with concrete artifacts.",
+            }
+            for _, phase, name in sorted(gaps)[:3]
+        ],
+        "verdict": verdict,
+    }
+
+
+def _batch(prompt):
+    blocks = list(_PROJECT_BLOCK_RE.finditer(prompt))
+    rubric = prompt[:blocks[0].start()] if blocks else prompt
+    projects = []
+    for i, block in enumerate(blocks):
+        end = blocks[i + 1].start() if i + 1 < len(blocks) else len(prompt)
+        answer = _case_study(rubric + prompt[block.start():end])
+        projects.append({"project": int(block.group(1)), "url": block.group(2), **answer})
+    return {"projects": projects}
+
+
+# ---------------------------------------
+# PORTFOLIO
+# ---------------------------------------
+def _json_section(prompt, header, default):
+    raw = _section(prompt, header)
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return default
+
+
+def _portfolio(prompt):
+    url = _line(prompt, "URL")
+    content = _json_section(prompt, "TEXT CONTENT", "")
+    links = [l for l in _json_section(prompt, "ANCHOR LINKS", []) if isinstance(l, dict)]
+    host = urlparse(url).netloc
+    sentences = _sentences(content if isinstance(content, str) else "")
+
+    hero = sentences[0] if sentences else ""
+    about = next((s for s in sentences[1:] if re.search(r"\b(I|I'm|I am|my)\b", s)), "")
+    skills = [term for term in SKILL_TERMS if term.lower() in str(content).lower()]
+
+    projects, socials, emails = [], [], _EMAIL_RE.findall(str(content))
+    for link in links:
+        href = link.get("href", "")
+        parsed = urlparse(href)
+        social = next((name for domain, name in SOCIAL_HOSTS.items()
+                       if parsed.netloc.endswith(domain)), None)
+        if href.startswith("mailto:"):
+            emails.append(href[len("mailto:"):])
+        elif social and not parsed.netloc.endswith(host or "\0"):
+            socials.append({"platform": social, "url": href})
+        elif (parsed.netloc in ("", host) or "/gallery/" in href) and not _NON_PROJECT_PATHS.match(parsed.path):
+            name = link.get("text") or parsed.path.rstrip("/").rsplit("/", 1)[-1].replace("-", " ").title()
+            projects.append({"name": name, "url": href})
+    projects = list({p["url"]: p for p in projects}.values())[:8]
+    phone = _PHONE_RE.search(str(content))
+
+    score = (40 + 10 * bool(hero) + 10 * bool(about) + min(20, 4 * len(projects))
+             + 10 * bool(emails) + min(10, 2 * len(skills)))
+    sections = [
+        ("Hero", hero, "Lead with the kind of product problems you solve and for whom."),
+        ("About", about, "Add a short personal story and the strengths that set you apart."),
+        ("Projects", ", ".join(p["name"] for p in projects),
+         "Show outcomes on each project card so visitors know which case study to open."),
+        ("Contact", ", ".join(dict.fromkeys(emails)),
+         "Make an email address or booking link visible without scrolling."),
+    ]
+
+    return {
+        "url": url,
+        "structured_content": {
+            "hero": hero,
+            "about": about,
+            "skills": skills,
+            "projects": projects,
+            "contact": {
+                "email": emails[0] if emails else "",
+                "phone": phone.group().strip() if phone else "",
+                "socials": socials,
+            },
+            "all_links": [{"text": l.get("text", ""), "href": l.get("href", "")} for l in links],
+        },
+        "analysis": {
+            "overall score": f"{score}/100",
+            "overall_feedback": f"The portfolio lists {len(projects)} projects and "
+                                f"{len(skills)} recognizable skills"
+                                f"{'' if emails else ' but no visible contact email'}.",
+            "section_wise": [
+                {
+                    "section": section,
+                    "existing": existing or "Not found",
+                    "suggestion": suggestion,
+                    "improved_example": f"{section}: {existing[:120]}" if existing else suggestion,
+                }
+                for section, existing, suggestion in sections
+            ],
+        },
+    }
@@ -0,0 +1,157 @@
+"""
+SQLite-backed report store
+Every report is namespaced by job ID and indexed, so reading one job's
+results is a single index lookup no matter how many analyses are stored.
+"""
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+REPORT_DB_PATH = os.environ.get("REPORT_DB_PATH", "backend/reports/reports.db")
+SCREENSHOT_ROOT = "backend/reports/screenshots"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id        TEXT NOT NULL,
+    portfolio_url TEXT NOT NULL,
+    kind          TEXT NOT NULL,
+    url           TEXT NOT NULL,
+    position      INTEGER NOT NULL DEFAULT 0,
+    created_at    TEXT NOT NULL,
+    payload       TEXT NOT NULL,
+    UNIQUE (job_id, kind, url)
+);
+CREATE INDEX IF NOT EXISTS idx_reports_job ON reports (job_id, kind, position);
+CREATE INDEX IF NOT EXISTS idx_reports_portfolio ON reports (portfolio_url, id);
+"""
+
+# Kinds of report stored per job
+PORTFOLIO = "portfolio"
+CASE_STUDY = "case_study"
+
+_local = threading.local()
+
+
+def _connect():
+    """One connection per thread (sqlite3 connections are not thread-safe)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(REPORT_DB_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(REPORT_DB_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def save_report(job_id, portfolio_url, kind, report, url=None, position=0):
+    """
+    Insert (or replace) one report for a job.
+
+    Args:
+        job_id (str): Job namespace
+        portfolio_url (str): Portfolio the report belongs to
+        kind (str): PORTFOLIO or CASE_STUDY
+        report (dict): Raw report JSON
+        url (str): Page the report describes (defaults to portfolio_url)
+        position (int): Ordering of case studies within the job
+
+    Returns:
+        int: row ID of the stored report
+    """
+    conn = _connect()
+    with conn:
+        cur = conn.execute(
+            """
+            INSERT OR REPLACE INTO reports
+                (job_id, portfolio_url, kind, url, position, created_at, payload)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                job_id, portfolio_url, kind, url or portfolio_url, position,
+                datetime.now().isoformat(),
+                json.dumps(report, ensure_ascii=False),
+            ),
+        )
+    return cur.lastrowid
+
+
+def get_job_reports(job_id):
+    """Return raw reports for one job: portfolio first, then case studies in order."""
+    rows = _connect().execute(
+        """
+        SELECT payload FROM reports
+        WHERE job_id = ?
+        ORDER BY kind = 'case_study', position, id
+        """,
+        (job_id,),
+    ).fetchall()
+    return [json.loads(payload) for (payload,) in rows]
+
+
+def screenshot_url(screenshot_path):
+    """Map a screenshot file path to its /reports/screenshots/ URL."""
+    if not screenshot_path:
+        return None
+
+    rel = os.path.relpath(os.path.abspath(screenshot_path), os.path.abspath(SCREENSHOT_ROOT))
+    if rel.startswith(".."):
+        rel = os.path.basename(screenshot_path)
+    return f"/reports/screenshots/{rel.replace(os.sep, '/')}"
+
+
+def report_view(raw):
+    """Normalize a raw stored report into the shape results.js renders."""
+    analysis = raw.get("analysis", {})
+
+    # -------------------------
+    # PORTFOLIO
+    # -------------------------
+    if "structured_content" in raw:
+        structured = raw.get("structured_content", {})
+
+        return {
+            "type": "portfolio",
+            "url": raw.get("url", ""),
+            "hero": structured.get("hero", ""),
+            "about": structured.get("about", ""),
+            "skills": structured.get("skills", []),
+            "projects": structured.get("projects", []),
+            "contact": structured.get("contact", {}),
+            "links": structured.get("all_links", []),
+
+            # FIXED KEYS
+            "overall_feedback": analysis.get("overall_feedback")
+                               or analysis.get("overall score")
+                               or "",
+            "sections": analysis.get("section_wise", [])
+        }
+
+    # -------------------------
+    # CASE STUDY
+    # -------------------------
+    if "scraped_data" in raw or "projectDetails" in raw or "analysis" in raw:
+        variants = raw.get("screenshot_variants") or {}
+
+        return {
+            "type": "case_study",
+            "url": raw.get("url", ""),
+            "title": raw.get("scraped_data", {}).get("title", "Untitled Case Study"),
+
+            # FIXED KEYS (camelCase)
+            "overallScore": analysis.get("overall_score", 0),
+            "phaseScores": analysis.get("phase_scores", []),
+            "summary": analysis.get("summary", ""),
+            "ux_keywords": analysis.get("ux_keywords", []),
+            "improvements": analysis.get("improvements", []),
+            "verdict": analysis.get("verdict", ""),
+            "screenshot": screenshot_url(raw.get("screenshot")),
+            "screenshot_preview": screenshot_url(variants.get("preview")),
+            "screenshot_thumb": screenshot_url(variants.get("thumbnail"))
+        }
+
+    return None
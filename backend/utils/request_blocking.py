@@ -0,0 +1,133 @@
+"""
+Network request blocking for browser-based scraping
+Route-interception profiles per purpose (text extraction vs screenshots)
+with per-platform overrides. Each installed profile counts the requests
+it blocked and estimates the bytes saved.
+"""
+import os
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+REQUEST_BLOCKING = os.environ.get("REQUEST_BLOCKING", "1") != "0"
+
+# Resource types (Playwright request.resource_type) dropped per purpose
+PROFILES = {
+    # Only text + links are read: skip everything that is purely visual
+    "text": {"block_types": {"image", "media", "font"}, "block_trackers": True},
+    # Keep images, fonts and CSS so the page renders as users see it
+    "screenshot": {"block_types": {"media"}, "block_trackers": True},
+}
+
+# (platform, profile) -> overrides merged into the base profile
+PLATFORM_OVERRIDES = {
+    # Designfolio text extraction only reads __NEXT_DATA__ and body text
+    ("designfolio", "text"): {"block_types": {"image", "media", "font", "stylesheet"}},
+}
+
+TRACKER_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "googlesyndication.com", "facebook.net", "hotjar.com", "segment.io",
+    "segment.com", "mixpanel.com", "amplitude.com", "fullstory.com",
+    "clarity.ms", "intercom.io", "hs-scripts.com", "hs-analytics.net",
+    "newrelic.com", "nr-data.net", "omtrdc.net", "demdex.net",
+    "adobedtm.com", "sentry.io", "linkedin.com/px", "ads-twitter.com",
+)
+
+# Rough transfer sizes used to estimate savings (aborted requests have no size)
+ESTIMATED_BYTES = {
+    "image": 80_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 40_000,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+_totals = Counter()
+_totals_lock = threading.Lock()
+
+
+def resolve_profile(profile, platform=None):
+    """Merge the base profile with any platform override."""
+    rules = dict(PROFILES[profile])
+    rules.update(PLATFORM_OVERRIDES.get((platform, profile), {}))
+    return rules
+
+
+def is_tracker(url):
+    parsed = urlparse(url)
+    target = parsed.netloc + parsed.path
+    return any(domain in target for domain in TRACKER_DOMAINS)
+
+
+class BlockStats:
+    """Per-page counters for one installed profile."""
+
+    def __init__(self, label):
+        self.label = label
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type = Counter()
+        self.estimated_bytes_saved = 0
+
+    def record_blocked(self, resource_type):
+        self.blocked += 1
+        self.blocked_by_type[resource_type] += 1
+        self.estimated_bytes_saved += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+
+    def report(self):
+        """Print the page summary and add it to the process totals."""
+        with _totals_lock:
+            _totals["pages"] += 1
+            _totals["allowed"] += self.allowed
+            _totals["blocked"] += self.blocked
+            _totals["estimated_bytes_saved"] += self.estimated_bytes_saved
+
+        if self.blocked:
+            total = self.allowed + self.blocked
+            saved_mb = self.estimated_bytes_saved / 1_000_000
+            types = ", ".join(f"{t}={n}" for t, n in self.blocked_by_type.most_common())
+            print(f"  🚫 [{self.label}] Blocked {self.blocked}/{total} requests "
+                  f"(~{saved_mb:.1f} MB saved: {types})")
+
+
+def install(context, profile, platform=None):
+    """
+    Install a blocking profile on a Playwright browser context (or page).
+
+    Args:
+        context: Playwright BrowserContext or Page
+        profile (str): Key of PROFILES ("text" or "screenshot")
+        platform (str): Optional platform for PLATFORM_OVERRIDES
+
+    Returns:
+        BlockStats, or None when blocking is disabled
+    """
+    if not REQUEST_BLOCKING or not profile:
+        return None
+
+    rules = resolve_profile(profile, platform)
+    block_types = rules["block_types"]
+    block_trackers = rules["block_trackers"]
+    stats = BlockStats(f"{profile}/{platform}" if platform else profile)
+
+    def handle(route):
+        request = route.request
+        resource_type = request.resource_type
+
+        if resource_type in block_types or (block_trackers and is_tracker(request.url)):
+            stats.record_blocked(resource_type)
+            route.abort("blockedbyclient")
+        else:
+            stats.allowed += 1
+            route.continue_()
+
+    context.route("**/*", handle)
+    return stats
+
+
+def totals():
+    """Process-wide blocking counters since startup."""
+    with _totals_lock:
+        return dict(_totals)
@@ -0,0 +1,169 @@
+"""
+Declared shapes of the Gemini responses
+Written in the OpenAPI subset Gemini accepts as response_schema (type,
+properties, required, items, nullable), so the same dicts drive
+structured output on the API side and validation of what comes back.
+"""
+
+STRING = {"type": "string"}
+NUMBER = {"type": "number"}
+
+
+def _object(properties, required=None):
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties) if required is None else required,
+    }
+
+
+def _array(items):
+    return {"type": "array", "items": items}
+
+
+# ---------------------------------------
+# PORTFOLIO (final.py main-page prompt)
+# ---------------------------------------
+PORTFOLIO_SCHEMA = _object({
+    "url": STRING,
+    "structured_content": _object({
+        "hero": STRING,
+        "about": STRING,
+        "skills": _array(STRING),
+        "projects": _array(_object({"name": STRING, "url": STRING})),
+        "contact": _object({
+            "email": STRING,
+            "phone": STRING,
+            "socials": _array(_object({"platform": STRING, "url": STRING})),
+        }),
+        "all_links": _array(_object({"text": STRING, "href": STRING})),
+    }),
+    "analysis": _object({
+        "overall score": STRING,
+        "overall_feedback": STRING,
+        "section_wise": _array(_object({
+            "section": STRING,
+            "existing": STRING,
+            "suggestion": STRING,
+            "improved_example": STRING,
+        })),
+    }),
+})
+
+# ---------------------------------------
+# CASE STUDY (casestudies.CASE_STUDY_RUBRIC)
+# ---------------------------------------
+_SCORED = {"score": NUMBER, "max_score": NUMBER, "reasoning": STRING}
+
+PHASE_SCORE_SCHEMA = _object({
+    "phase": STRING,
+    **_SCORED,
+    "subsections": _array(_object({"name": STRING, **_SCORED})),
+})
+
+_CASE_STUDY_PROPERTIES = {
+    "overall_score": NUMBER,
+    "phase_scores": _array(PHASE_SCORE_SCHEMA),
+    "summary": STRING,
+    "ux_keywords": _array(STRING),
+    "improvements": _array(_object({
+        "phase": STRING,
+        "issue": STRING,
+        "recommendation": STRING,
+    })),
+    "verdict": STRING,
+}
+
+CASE_STUDY_SCHEMA = _object(_CASE_STUDY_PROPERTIES)
+
+# SCORING_MODE=batch: one element per project, numbered as in the prompt
+CASE_STUDY_BATCH_SCHEMA = _object({
+    "projects": _array(_object({
+        "project": {"type": "integer"},
+        "url": STRING,
+        **_CASE_STUDY_PROPERTIES,
+    })),
+})
+
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+}
+
+
+def coerce(value, schema):
+    """
+    Fix harmless type slips in place of re-asking: numbers sent as
+    strings ("12", "12/15"), numbers where strings are expected, and a
+    single item where a list is expected. Returns the coerced value.
+    """
+    kind = schema.get("type")
+    if kind == "object" and isinstance(value, dict):
+        for key, sub in schema.get("properties", {}).items():
+            if key in value:
+                value[key] = coerce(value[key], sub)
+    elif kind == "array":
+        if isinstance(value, dict) and schema["items"].get("type") == "object":
+            value = [value]
+        if isinstance(value, list):
+            value = [coerce(item, schema["items"]) for item in value]
+    elif kind in ("number", "integer") and isinstance(value, str):
+        head = value.strip().split("/")[0].strip()
+        try:
+            number = float(head)
+            value = int(number) if kind == "integer" or number.is_integer() else number
+        except ValueError:
+            pass
+    elif kind == "string" and isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    return value
+
+
+def validate(value, schema, path=""):
+    """
+    Check value against schema.
+
+    Returns:
+        list: (path, problem) pairs; empty when valid. Paths look like
+        "phase_scores[2].score".
+    """
+    if value is None:
+        return [] if schema.get("nullable") else [(path, "missing")]
+
+    kind = schema.get("type")
+    if kind and not _TYPE_CHECKS[kind](value):
+        return [(path, f"expected {kind}, got {type(value).__name__}")]
+
+    errors = []
+    if kind == "object":
+        for key, sub in schema.get("properties", {}).items():
+            child = f"{path}.{key}" if path else key
+            if key not in value:
+                if key in schema.get("required", []):
+                    errors.append((child, "missing"))
+                continue
+            errors.extend(validate(value[key], sub, child))
+    elif kind == "array":
+        for i, item in enumerate(value):
+            errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+def top_level_fields(errors):
+    """Top-level property names touched by validation errors, in order."""
+    fields = []
+    for path, _ in errors:
+        field = path.split(".")[0].split("[")[0]
+        if field and field not in fields:
+            fields.append(field)
+    return fields
+
+
+def subset(schema, fields):
+    """Object schema restricted to the given top-level properties."""
+    return _object({key: schema["properties"][key] for key in fields})
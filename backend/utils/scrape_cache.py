@@ -0,0 +1,291 @@
+"""
+Persistent scrape cache
+Stores scraped page data, platform extractions and screenshots on disk,
+keyed by kind + normalized URL. Fresh entries (younger than
+SCRAPE_CACHE_TTL) skip the network entirely; stale entries with an
+ETag/Last-Modified are revalidated with a conditional GET. Total payload
+size is bounded with least-recently-used eviction.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import Counter
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from utils import http_client
+
+SCRAPE_CACHE = os.environ.get("SCRAPE_CACHE", "1") != "0"
+SCRAPE_CACHE_PATH = os.environ.get("SCRAPE_CACHE_PATH", "backend/cache/scrape_cache.db")
+SCRAPE_CACHE_TTL = int(os.environ.get("SCRAPE_CACHE_TTL", 24 * 60 * 60))  # seconds
+SCRAPE_CACHE_MAX_BYTES = int(os.environ.get("SCRAPE_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key           TEXT PRIMARY KEY,
+    kind          TEXT NOT NULL,
+    url           TEXT NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    stored_at     REAL NOT NULL,
+    accessed_at   REAL NOT NULL,
+    size          INTEGER NOT NULL,
+    payload       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at);
+"""
+
+# Query parameters that never change page content
+_TRACKING_PREFIXES = ("utm_",)
+_TRACKING_PARAMS = {"fbclid", "gclid", "ref"}
+
+_local = threading.local()
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+class CacheEntry:
+    def __init__(self, payload, etag, last_modified, stored_at):
+        self.payload = payload
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    @property
+    def fresh(self):
+        return time.time() - self.stored_at < SCRAPE_CACHE_TTL
+
+    def conditional_headers(self):
+        """If-None-Match / If-Modified-Since headers, or {} if no validators."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(SCRAPE_CACHE_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(SCRAPE_CACHE_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _count(kind, event):
+    with _counters_lock:
+        _counters[(kind, event)] += 1
+
+
+def normalize_url(url):
+    """Canonical form used as cache key: lowercase host, no fragment/tracking params."""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (scheme, parts.port) in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not (k.lower().startswith(_TRACKING_PREFIXES) or k.lower() in _TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def _key(kind, url):
+    return f"{kind}|{normalize_url(url)}"
+
+
+def lookup(kind, url):
+    """Return the CacheEntry for kind + url (fresh or stale), or None."""
+    if not SCRAPE_CACHE:
+        return None
+
+    conn = _connect()
+    key = _key(kind, url)
+    row = conn.execute(
+        "SELECT payload, etag, last_modified, stored_at FROM entries WHERE key = ?", (key,)
+    ).fetchone()
+    if row is None:
+        return None
+
+    with conn:
+        conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+    payload, etag, last_modified, stored_at = row
+    return CacheEntry(json.loads(payload), etag, last_modified, stored_at)
+
+
+def store(kind, url, payload, headers=None):
+    """
+    Save payload for kind + url, with validators taken from response headers.
+
+    Args:
+        headers (mapping): Response headers carrying ETag / Last-Modified
+    """
+    if not SCRAPE_CACHE:
+        return
+
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    data = json.dumps(payload, ensure_ascii=False)
+    now = time.time()
+
+    conn = _connect()
+    with conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO entries
+                (key, kind, url, etag, last_modified, stored_at, accessed_at, size, payload)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (_key(kind, url), kind, url, headers.get("etag"), headers.get("last-modified"),
+             now, now, len(data), data),
+        )
+    _evict(conn)
+
+
+def refresh(kind, url):
+    """Mark an entry fresh again after a 304 Not Modified."""
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "UPDATE entries SET stored_at = ? WHERE key = ?", (time.time(), _key(kind, url))
+        )
+
+
+def _evict(conn):
+    """Drop least-recently-used entries until under SCRAPE_CACHE_MAX_BYTES."""
+    (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+    if total <= SCRAPE_CACHE_MAX_BYTES:
+        return
+
+    evicted = 0
+    with conn:
+        for key, size in conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        ).fetchall():
+            if total <= SCRAPE_CACHE_MAX_BYTES:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+
+    with _counters_lock:
+        _counters[("*", "evictions")] += evicted
+
+
+def _revalidate(url, entry):
+    """Conditional GET; True if the server says the page is unchanged."""
+    headers = entry.conditional_headers()
+    if not headers:
+        return False
+    try:
+        # Only the status and validators matter; stop reading a 200 body at once
+        response = http_client.get(url, headers=headers, retries=1, max_bytes=0)
+    except Exception:
+        return False
+    if response.status_code == 304:
+        return True
+    etag = response.headers.get("ETag")
+    return bool(entry.etag and etag and etag == entry.etag)
+
+
+def cached(kind, url, produce, is_valid=None):
+    """
+    Return a cached payload, or produce and cache it.
+
+    Args:
+        kind (str): Cache namespace (e.g. "extract:behance", "screenshot")
+        url (str): Page URL (normalized for the key)
+        produce (callable): Returns (payload, response_headers); exceptions propagate
+        is_valid (callable): Optional check that a cached payload is still usable
+            (e.g. screenshot files still on disk); also gates what gets stored
+
+    Returns:
+        payload
+    """
+    entry = lookup(kind, url)
+
+    if entry is not None and (is_valid is None or is_valid(entry.payload)):
+        if entry.fresh:
+            _count(kind, "hits")
+            return entry.payload
+        if _revalidate(url, entry):
+            _count(kind, "revalidated")
+            refresh(kind, url)
+            return entry.payload
+
+    _count(kind, "misses")
+    payload, headers = produce()
+    if is_valid is None or is_valid(payload):
+        store(kind, url, payload, headers)
+    return payload
+
+
+def cached_fetch(kind, url, parse, max_bytes=None):
+    """
+    GET url and parse it, using the cache and a conditional request.
+
+    A fresh entry is returned without any request; a stale one is sent
+    as If-None-Match/If-Modified-Since so a 304 reuses the stored payload.
+
+    Args:
+        kind (str): Cache namespace
+        url (str): Page URL
+        parse (callable): Turns a successful HttpResponse into the payload
+        max_bytes (int): Body download cap (see http_client.get)
+
+    Raises:
+        http_client.HTTPError for 4xx/5xx responses (nothing is cached)
+    """
+    entry = lookup(kind, url)
+    if entry is not None and entry.fresh:
+        _count(kind, "hits")
+        return entry.payload
+
+    response = http_client.get(url, headers=entry.conditional_headers() if entry else None,
+                               max_bytes=max_bytes)
+    if entry is not None and response.status_code == 304:
+        _count(kind, "revalidated")
+        refresh(kind, url)
+        return entry.payload
+
+    response.raise_for_status()
+    _count(kind, "misses")
+    payload = parse(response)
+    store(kind, url, payload, response.headers)
+    return payload
+
+
+def stats():
+    """Hit/miss/revalidation counters per kind plus current cache size."""
+    with _counters_lock:
+        counters = dict(_counters)
+
+    by_kind = {}
+    for (kind, event), value in counters.items():
+        by_kind.setdefault(kind, {})[event] = value
+
+    if not SCRAPE_CACHE:
+        return {"enabled": False, "counters": by_kind}
+
+    entries, size = _connect().execute(
+        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+    ).fetchone()
+    return {
+        "enabled": True,
+        "ttl_seconds": SCRAPE_CACHE_TTL,
+        "entries": entries,
+        "bytes": size,
+        "max_bytes": SCRAPE_CACHE_MAX_BYTES,
+        "counters": by_kind,
+    }
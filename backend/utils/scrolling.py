@@ -0,0 +1,114 @@
+"""
+Adaptive lazy-load scrolling for Playwright pages
+Scrolls in small steps while new content or images keep appearing and in
+growing steps while nothing changes. Stops at the real bottom (height no
+longer growing), at a maximum distance, or when the time budget runs out,
+and reports how much content the scroll revealed.
+"""
+import os
+
+SCROLL_MAX_DISTANCE = int(os.environ.get("SCROLL_MAX_DISTANCE", 30000))  # px
+SCROLL_BUDGET_MS = int(os.environ.get("SCROLL_BUDGET_MS", 8000))
+SCROLL_MIN_STEP = 800    # px, used while content is still appearing
+SCROLL_MAX_STEP = 2400   # px, reached by doubling while nothing changes
+SCROLL_INTERVAL_MS = 100
+SCROLL_SETTLE_MS = 600   # wait at the bottom / for visible images before giving up
+
+_SCROLL_JS = """
+async (opts) => {
+    const started = performance.now();
+    const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+    const elapsed = () => performance.now() - started;
+    const docHeight = () => Math.max(
+        document.documentElement.scrollHeight, document.body ? document.body.scrollHeight : 0
+    );
+    const pendingImages = () => [...document.images].filter(img => {
+        if (img.complete || !(img.currentSrc || img.src)) return false;
+        const rect = img.getBoundingClientRect();
+        return rect.bottom > 0 && rect.top < window.innerHeight;
+    });
+    const waitForImages = async (images, ms) => {
+        await Promise.race([
+            Promise.all(images.map(img => new Promise(resolve => {
+                img.addEventListener('load', resolve, { once: true });
+                img.addEventListener('error', resolve, { once: true });
+            }))),
+            sleep(ms)
+        ]);
+    };
+
+    const startHeight = docHeight();
+    const startImages = document.images.length;
+    let lastHeight = startHeight;
+    let step = opts.minStep;
+    let scrolled = 0;
+    let stopped = 'bottom';
+
+    while (true) {
+        if (elapsed() >= opts.budgetMs) { stopped = 'budget'; break; }
+        if (scrolled >= opts.maxDistance) { stopped = 'max_distance'; break; }
+
+        const before = window.scrollY;
+        window.scrollBy(0, step);
+        scrolled += window.scrollY - before;
+        await sleep(opts.intervalMs);
+
+        const height = docHeight();
+        const pending = pendingImages();
+        const changed = height > lastHeight || pending.length > 0;
+        lastHeight = height;
+
+        if (pending.length) await waitForImages(pending, opts.settleMs);
+        // never jump more than two viewports so IntersectionObserver-based
+        // lazy loaders still see every section pass by
+        step = changed ? opts.minStep : Math.min(step * 2, opts.maxStep, 2 * window.innerHeight);
+
+        if (window.scrollY + window.innerHeight >= docHeight() - 2) {
+            if (scrolled === 0) break;  // page fits in the viewport
+            // At the bottom: give infinite-scroll pages one chance to grow
+            await sleep(opts.settleMs);
+            if (docHeight() <= height) break;
+            lastHeight = docHeight();
+        }
+    }
+
+    window.scrollTo(0, 0);
+
+    return {
+        scrolled: Math.round(scrolled),
+        start_height: startHeight,
+        end_height: docHeight(),
+        revealed_px: docHeight() - startHeight,
+        new_images: document.images.length - startImages,
+        elapsed_ms: Math.round(elapsed()),
+        stopped: stopped
+    };
+}
+"""
+
+
+def scroll_page(page, max_distance=SCROLL_MAX_DISTANCE, budget_ms=SCROLL_BUDGET_MS):
+    """
+    Scroll through the page so lazy content renders, then return to the top.
+
+    Args:
+        page: Loaded Playwright page
+        max_distance (int): Stop after scrolling this many px
+        budget_ms (int): Stop after this much time
+
+    Returns:
+        dict: scrolled, start_height, end_height, revealed_px, new_images,
+              elapsed_ms, stopped ("bottom", "max_distance" or "budget")
+    """
+    stats = page.evaluate(_SCROLL_JS, {
+        "maxDistance": max_distance,
+        "budgetMs": budget_ms,
+        "minStep": SCROLL_MIN_STEP,
+        "maxStep": SCROLL_MAX_STEP,
+        "intervalMs": SCROLL_INTERVAL_MS,
+        "settleMs": SCROLL_SETTLE_MS,
+    })
+
+    print(f"  📜 Scrolled {stats['scrolled']}px in {stats['elapsed_ms']} ms "
+          f"(+{stats['revealed_px']}px, +{stats['new_images']} images, stopped: {stats['stopped']})")
+    return stats
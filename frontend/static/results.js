@@ -1,20 +1,133 @@
 // results.js
 
-document.addEventListener("DOMContentLoaded", async () => {
+document.addEventListener("DOMContentLoaded", () => {
     const root = document.getElementById("resultsRoot");
     if (!root) return;
 
+    const jobId = new URLSearchParams(window.location.search).get("job");
+
+    if (jobId && window.EventSource) {
+        streamResults(root, jobId);
+    } else {
+        loadReports(root, jobId);
+    }
+});
+
+async function loadReports(root, jobId) {
+    if (!jobId) {
+        root.innerHTML = `<div class="no-results">No analysis selected</div>`;
+        return;
+    }
+
     root.innerHTML = `<div class="loading">Loading analysis results...</div>`;
 
     try {
-        const res = await fetch("/reports");
+        const res = await fetch(`/reports?job=${encodeURIComponent(jobId)}`);
         const data = await res.json();
         renderResults(root, data || []);
     } catch (err) {
         console.error(err);
         root.innerHTML = `<div class="error">Failed to load reports</div>`;
     }
-});
+}
+
+/* ==========================
+   LIVE RESULTS (SSE)
+   ========================== */
+
+function streamResults(root, jobId) {
+    root.innerHTML = "";
+
+    const status = document.createElement("div");
+    status.className = "loading";
+    status.textContent = "Waiting for first results...";
+
+    const portfolioSlot = document.createElement("div");
+    const header = document.createElement("div");
+    header.className = "case-study-header";
+    const list = document.createElement("div");
+
+    root.append(status, portfolioSlot, header, list);
+
+    let received = 0;
+    let caseCount = 0;
+    const source = new EventSource(`/jobs/${encodeURIComponent(jobId)}/events`);
+
+    // keep case studies in portfolio order regardless of finish order
+    const placeCard = (card, position) => {
+        card.dataset.position = position;
+        const existing = [...list.children].find(c => Number(c.dataset.position) === position);
+        if (existing) {
+            existing.replaceWith(card);
+            return;
+        }
+        const next = [...list.children].find(c => Number(c.dataset.position) > position);
+        list.insertBefore(card, next || null);
+    };
+
+    source.addEventListener("stage", e => {
+        received++;
+        const data = JSON.parse(e.data);
+        status.textContent = data.message;
+
+        if (data.stage === "project_failed") {
+            const pending = [...list.querySelectorAll(".cs-pending")].find(c => c.dataset.url === data.url);
+            if (pending) pending.remove();
+        }
+    });
+
+    // phase scores of a case study Gemini is still writing
+    source.addEventListener("partial", e => {
+        received++;
+        const { position, url, title, phase } = JSON.parse(e.data);
+
+        let card = [...list.children].find(c => Number(c.dataset.position) === position);
+        if (card && !card.classList.contains("cs-pending")) return;  // final report already shown
+        if (!card) {
+            card = renderPendingCaseStudy(title, url);
+            placeCard(card, position);
+        }
+        addPendingPhase(card, phase);
+    });
+
+    source.addEventListener("report", e => {
+        received++;
+        const { report, position, message } = JSON.parse(e.data);
+        status.textContent = message;
+
+        if (report.type === "portfolio") {
+            portfolioSlot.replaceChildren(renderPortfolioOverview(report));
+            return;
+        }
+
+        placeCard(renderCaseStudyDropdown(report, position), position);
+
+        caseCount++;
+        header.innerHTML = `<h1>${caseCount} Case Studies Analyzed</h1>`;
+    });
+
+    source.addEventListener("done", e => {
+        source.close();
+        const { status: jobStatus, error } = JSON.parse(e.data);
+
+        if (jobStatus === "failed") {
+            status.className = "error";
+            status.textContent = `Analysis failed: ${error || "unknown error"}`;
+        } else if (!portfolioSlot.children.length && !caseCount) {
+            status.className = "no-results";
+            status.textContent = "No reports found";
+        } else {
+            status.remove();
+        }
+    });
+
+    // Stream unavailable (e.g. job expired): load stored reports instead
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && !received) {
+            loadReports(root, jobId);
+        }
+    };
+}
 
 function renderResults(root, reports) {
     root.innerHTML = "";
@@ -138,20 +251,22 @@ function renderCaseStudyDropdown(cs, index) {
     const summary = cs.summary || cs.analysis?.summary || "";
     const verdict = cs.verdict || cs.analysis?.verdict || "";
 
-    // screenshot path from normalized object OR raw analysis
-    // FIX: Always point screenshot to the Flask route
-    let screenshot = null;
-
-if (cs.screenshot) {
-    const clean = cs.screenshot.split("/").pop();
-    screenshot = `/reports/screenshots/${clean}`;
-}
+    // screenshot URLs are already resolved to the Flask route by /reports;
+    // the small thumbnail sits in the collapsed row, the preview (linking to
+    // the full-size master) is only fetched when the details are opened
+    const screenshot = cs.screenshot || null;
+    const screenshotThumb = cs.screenshot_thumb || null;
+    const screenshotPreview = cs.screenshot_preview || screenshot;
 
 
 
 
     card.innerHTML = `
         <div class="cs-header-row">
+            ${screenshotThumb ? `
+            <img src="${screenshotThumb}" alt="" class="cs-thumb">
+            ` : ""}
+
             <div class="cs-header-text">
                 <div class="cs-project-title">${title}</div>
                 <div class="cs-project-meta">
@@ -173,9 +288,10 @@ if (cs.screenshot) {
             <div class="cs-details-inner">
 
                 ${screenshot ? `
-                <div class="cs-screenshot-wrap">
-                    <img src="${screenshot}" alt="Case study screenshot" class="cs-screenshot">
-                </div>
+                <a class="cs-screenshot-wrap" href="${screenshot}" target="_blank" rel="noopener noreferrer">
+                    <img data-preview="${screenshotPreview}"
+                         alt="Case study screenshot" class="cs-screenshot">
+                </a>
                 ` : ""}
 
                 <section class="summary-box">
@@ -233,6 +349,55 @@ if (cs.screenshot) {
     return card;
 }
 
+/* ==========================
+   PENDING CASE STUDY (STREAMING)
+   ========================== */
+
+function renderPendingCaseStudy(title, url) {
+    const card = document.createElement("div");
+    card.className = "case-study-block cs-pending";
+    card.dataset.url = url;
+    card.dataset.score = 0;
+
+    card.innerHTML = `
+        <div class="cs-header-row">
+            <div class="cs-header-text">
+                <div class="cs-project-title">${title || "Untitled Project"}</div>
+                <div class="cs-project-meta">
+                    <span class="cs-pending-label">Scoring… 0 phases done</span>
+                </div>
+            </div>
+
+            <div class="cs-score-pill">
+                <span class="cs-score-value">0</span>
+                <span class="cs-score-label">so far</span>
+            </div>
+        </div>
+        <div class="phase-list"></div>
+    `;
+
+    return card;
+}
+
+function addPendingPhase(card, phase) {
+    const phases = card.querySelector(".phase-list");
+    const row = document.createElement("div");
+    row.className = "phase-card";
+    row.innerHTML = `
+        <div class="phase-header">
+            <span class="phase-title">${phase.phase}</span>
+            <span class="phase-score">${phase.score}/${phase.max_score}</span>
+        </div>
+    `;
+    phases.appendChild(row);
+
+    const score = Number(card.dataset.score) + (Number(phase.score) || 0);
+    card.dataset.score = score;
+    card.querySelector(".cs-score-value").textContent = score;
+    card.querySelector(".cs-pending-label").textContent =
+        `Scoring… ${phases.children.length} phase${phases.children.length === 1 ? "" : "s"} done`;
+}
+
 function renderSubsections(subsections) {
     if (!Array.isArray(subsections) || !subsections.length) return "";
 
@@ -268,5 +433,12 @@ document.addEventListener("click", (e) => {
     } else {
         panel.classList.add("cs-open");
         btn.textContent = "Hide Details";
+
+        // load the preview image on first open
+        const img = panel.querySelector("img[data-preview]");
+        if (img) {
+            img.src = img.dataset.preview;
+            img.removeAttribute("data-preview");
+        }
     }
 });